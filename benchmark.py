@@ -0,0 +1,137 @@
+import sys
+from pathlib import Path
+
+import click
+
+from common.benchmark import (
+    BenchmarkResults,
+    benchmark_key,
+    benchmark_solution,
+    find_regressions,
+    load_results,
+    save_results,
+)
+from common.import_solutions import available_days
+from common.parallel import set_default_workers
+from common.runner import (
+    default_input_path,
+    format_duration,
+    parse_day_ranges,
+)
+from common.solution import SolutionBase
+
+
+@click.command()
+@click.option("--year", type=int, default=2024)
+@click.option("--days", help="e.g. 1-12 or 1,3,5-7, defaults to every day.")
+@click.option("--repeat", type=int, default=5, show_default=True)
+@click.option("--warmup", type=int, default=1, show_default=True)
+@click.option(
+    "--workers",
+    type=int,
+    default=1,
+    show_default=True,
+    help="Processes a solution may fork internally. Pinned so results don't "
+    "depend on the machine's core count.",
+)
+@click.option(
+    "--output",
+    type=click.Path(path_type=Path),
+    default=Path(".benchmarks/latest.json"),
+    show_default=True,
+)
+@click.option(
+    "--baseline",
+    type=click.Path(path_type=Path),
+    default=Path(".benchmarks/baseline.json"),
+    show_default=True,
+)
+@click.option("--save-baseline", is_flag=True, help="Overwrite the baseline file.")
+@click.option(
+    "--threshold",
+    type=float,
+    default=10.0,
+    show_default=True,
+    help="Flag phases whose median got slower by more than this percentage.",
+)
+@click.option(
+    "--noise-floor-ms",
+    type=float,
+    default=1.0,
+    show_default=True,
+    help="Ignore slowdowns smaller than this many milliseconds.",
+)
+def main(
+    year: int,
+    days: str | None,
+    repeat: int,
+    warmup: int,
+    workers: int,
+    output: Path,
+    baseline: Path,
+    save_baseline: bool,
+    threshold: float,
+    noise_floor_ms: float,
+):
+    set_default_workers(workers)
+
+    selected_days = available_days(year)
+    if days is not None:
+        day_filter = parse_day_ranges(days)
+        selected_days = [day for day in selected_days if day in day_filter]
+
+    results: BenchmarkResults = {}
+    for day in selected_days:
+        input_path = default_input_path(year, day)
+        if not input_path.exists():
+            click.echo(f"Skipping day {day}: no input at {input_path}", err=True)
+            continue
+
+        key = benchmark_key(year, day)
+        solution = SolutionBase.get_solution(year, day)
+        results[key] = benchmark_solution(
+            solution, input_path.read_text(), repeat=repeat, warmup=warmup
+        )
+
+        for phase, stats in results[key].items():
+            print(
+                f"{key} {phase:>7}: median {format_duration(stats.median):>9}, "
+                f"p95 {format_duration(stats.p95):>9}, "
+                f"min {format_duration(stats.min):>9}"
+            )
+
+    save_results(output, results, repeat=repeat, warmup=warmup, workers=workers)
+    print(f"\nWrote results to {output}")
+
+    if save_baseline:
+        save_results(baseline, results, repeat=repeat, warmup=warmup, workers=workers)
+        print(f"Wrote baseline to {baseline}")
+        return
+
+    if not baseline.exists():
+        print(f"No baseline at {baseline}, skipping regression check")
+        return
+
+    regressions = find_regressions(
+        load_results(baseline),
+        results,
+        threshold_percent=threshold,
+        noise_floor_seconds=noise_floor_ms / 1000,
+    )
+    if not regressions:
+        print(f"No regressions over {threshold}% against {baseline}")
+        return
+
+    print(f"\n{len(regressions)} regression(s) over {threshold}% against {baseline}:")
+    for regression in regressions:
+        print(
+            f"  {regression.key} {regression.phase}: "
+            f"{format_duration(regression.baseline_seconds)} -> "
+            f"{format_duration(regression.current_seconds)} "
+            f"(+{regression.slowdown_percent:.1f}%)"
+        )
+    sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
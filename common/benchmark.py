@@ -0,0 +1,149 @@
+import io
+import json
+import os
+import platform
+import statistics
+from contextlib import redirect_stdout
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from time import perf_counter
+from typing import Callable
+
+from common.solution import SolutionBase
+
+PHASES = ("parse", "part_01", "part_02")
+
+
+@dataclass(kw_only=True, frozen=True)
+class PhaseStats:
+    median: float
+    p95: float
+    min: float
+    samples: int
+
+    @classmethod
+    def from_samples(cls, samples: list[float]) -> "PhaseStats":
+        if len(samples) > 1:
+            p95 = statistics.quantiles(samples, n=20, method="inclusive")[-1]
+        else:
+            p95 = samples[0]
+
+        return cls(
+            median=statistics.median(samples),
+            p95=p95,
+            min=min(samples),
+            samples=len(samples),
+        )
+
+
+@dataclass(kw_only=True, frozen=True)
+class Regression:
+    key: str
+    phase: str
+    baseline_seconds: float
+    current_seconds: float
+
+    @property
+    def slowdown_percent(self) -> float:
+        return (self.current_seconds / self.baseline_seconds - 1) * 100
+
+
+BenchmarkResults = dict[str, dict[str, PhaseStats]]
+
+
+def benchmark_key(year: int, day: int) -> str:
+    return f"{year}/{day:02}"
+
+
+def _timed(fn: Callable[[], object]) -> tuple[object, float]:
+    start = perf_counter()
+    result = fn()
+    return result, perf_counter() - start
+
+
+def benchmark_solution(
+    solution: SolutionBase[object], input_text: str, *, repeat: int, warmup: int
+) -> dict[str, PhaseStats]:
+    samples: dict[str, list[float]] = {phase: [] for phase in PHASES}
+
+    with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+        for iteration in range(warmup + repeat):
+            # Parts are timed against their own freshly parsed input, since some
+            # solutions consume or mutate what `parse_input` returns, but only
+            # one parse per iteration is timed so every phase has one sample
+            iteration_samples: dict[str, float] = {}
+            for part_phase, part in (
+                ("part_01", SolutionBase.Part.ONE),
+                ("part_02", SolutionBase.Part.TWO),
+            ):
+                parsed_input, parse_seconds = _timed(
+                    lambda: solution.parse_input(io.StringIO(input_text))
+                )
+                iteration_samples.setdefault("parse", parse_seconds)
+                _, iteration_samples[part_phase] = _timed(
+                    lambda: solution.solve_part(parsed_input, part)
+                )
+
+            if iteration >= warmup:
+                for phase, seconds in iteration_samples.items():
+                    samples[phase].append(seconds)
+
+    return {phase: PhaseStats.from_samples(samples[phase]) for phase in PHASES}
+
+
+def find_regressions(
+    baseline: BenchmarkResults,
+    current: BenchmarkResults,
+    *,
+    threshold_percent: float,
+    noise_floor_seconds: float,
+) -> list[Regression]:
+    regressions: list[Regression] = []
+    for key, phases in current.items():
+        if key not in baseline:
+            continue
+
+        for phase, stats in phases.items():
+            if phase not in baseline[key]:
+                continue
+
+            baseline_median = baseline[key][phase].median
+            is_slower = stats.median > baseline_median * (1 + threshold_percent / 100)
+            is_measurable = stats.median - baseline_median > noise_floor_seconds
+            if is_slower and is_measurable:
+                regressions.append(
+                    Regression(
+                        key=key,
+                        phase=phase,
+                        baseline_seconds=baseline_median,
+                        current_seconds=stats.median,
+                    )
+                )
+
+    return regressions
+
+
+def save_results(
+    path: Path, results: BenchmarkResults, *, repeat: int, warmup: int, workers: int
+):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    payload = {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "repeat": repeat,
+        "warmup": warmup,
+        "workers": workers,
+        "results": {
+            key: {phase: asdict(stats) for phase, stats in phases.items()}
+            for key, phases in results.items()
+        },
+    }
+    path.write_text(json.dumps(payload, indent=2) + "\n")
+
+
+def load_results(path: Path) -> BenchmarkResults:
+    payload = json.loads(path.read_text())
+    return {
+        key: {phase: PhaseStats(**stats) for phase, stats in phases.items()}
+        for key, phases in payload["results"].items()
+    }
@@ -0,0 +1,136 @@
+import hashlib
+import os
+import pickle
+import sys
+from dataclasses import dataclass
+from functools import cache
+from pathlib import Path
+
+DEFAULT_CACHE_PATH = Path(".cache")
+
+# Where solutions may persist their own state across runs, if anywhere
+_state_dir: Path | None = None
+
+
+def set_state_dir(path: Path | None) -> None:
+    global _state_dir
+    _state_dir = path
+
+
+def state_dir() -> Path | None:
+    return _state_dir
+
+
+def content_digest(text: str) -> str:
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+@cache
+def module_source_digest(module_name: str) -> str:
+    module_file = sys.modules[module_name].__file__
+    assert module_file is not None, f"{module_name} has no source file"
+
+    return hashlib.sha256(Path(module_file).read_bytes()).hexdigest()
+
+
+@cache
+def package_source_digest(package_name: str) -> str:
+    package_file = sys.modules[package_name].__file__
+    assert package_file is not None, f"{package_name} has no source file"
+
+    package_dir = Path(package_file).parent
+    digest = hashlib.sha256()
+    for source_path in sorted(package_dir.rglob("*.py")):
+        digest.update(source_path.relative_to(package_dir).as_posix().encode())
+        digest.update(source_path.read_bytes())
+
+    return digest.hexdigest()
+
+
+def solution_source_digest(module_name: str) -> str:
+    """
+    Digest of a solution module's source and of the `common` package, whose
+    grids, regions and coordinates build much of what solutions parse.
+    """
+    return content_digest(
+        module_source_digest(module_name) + package_source_digest("common")
+    )
+
+
+@dataclass
+class DiskCache:
+    """
+    Pickle-backed key/value store bounded to `max_bytes`, evicting the least
+    recently used entries first. Pickle protocol 5 stores numpy arrays as raw
+    buffers, and its memo writes objects shared across a structure only once.
+    """
+
+    path: Path
+    max_bytes: int = 512 * 1024 * 1024
+    hits: int = 0
+    misses: int = 0
+
+    def get(self, key: str) -> tuple[bool, object]:
+        entry_path = self._entry_path(key)
+        try:
+            with open(entry_path, "rb") as f:
+                value = pickle.load(f)
+        except FileNotFoundError:
+            self.misses += 1
+            return False, None
+        except Exception:
+            # Stale entries, e.g. pickled classes that have since changed shape
+            entry_path.unlink(missing_ok=True)
+            self.misses += 1
+            return False, None
+
+        # Modification time doubles as the last access time for eviction. Another
+        # process may have evicted the entry since it was read, which is fine.
+        try:
+            os.utime(entry_path)
+        except FileNotFoundError:
+            pass
+        self.hits += 1
+        return True, value
+
+    def put(self, key: str, value: object) -> None:
+        try:
+            data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        except (pickle.PicklingError, TypeError, AttributeError):
+            return
+
+        if len(data) > self.max_bytes:
+            return
+
+        self.path.mkdir(parents=True, exist_ok=True)
+        entry_path = self._entry_path(key)
+
+        # Concurrent workers may write the same entry, so write then rename
+        tmp_path = entry_path.with_suffix(f".{os.getpid()}.tmp")
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, entry_path)
+
+        self._evict()
+
+    def _entry_path(self, key: str) -> Path:
+        return self.path / f"{key}.pickle"
+
+    def _evict(self) -> None:
+        entries: list[tuple[float, int, Path]] = []
+        for entry in os.scandir(self.path):
+            if not entry.name.endswith(".pickle"):
+                continue
+
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, Path(entry.path)))
+
+        total_bytes = sum(size for _, size, _ in entries)
+        for _, size, entry_path in sorted(entries):
+            if total_bytes <= self.max_bytes:
+                break
+
+            entry_path.unlink(missing_ok=True)
+            total_bytes -= size
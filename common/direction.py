@@ -1,45 +1,116 @@
-from enum import auto, Enum
-from typing import Self
+from __future__ import annotations
 
+from enum import IntEnum
+from functools import cache
+from typing import TYPE_CHECKING
 
-class Direction(Enum):
-    NORTH = auto()
-    EAST = auto()
-    SOUTH = auto()
-    WEST = auto()
+if TYPE_CHECKING:
+    import numpy as np
+
+
+class Direction(IntEnum):
+    """
+    The four cardinal directions, numbered clockwise from north so that turning
+    is modular arithmetic. The properties are plain table lookups, and the
+    tables below can be indexed by ordinal directly in hot loops.
+    """
+
+    NORTH = 0
+    EAST = 1
+    SOUTH = 2
+    WEST = 3
+
+    @property
+    def clockwise_direction(self) -> Direction:
+        return CLOCKWISE[self]
 
     @property
-    def clockwise_direction(self) -> Self:
-        match self:
-            case Direction.NORTH:
-                return Direction.EAST
-            case Direction.EAST:
-                return Direction.SOUTH
-            case Direction.SOUTH:
-                return Direction.WEST
-            case Direction.WEST:
-                return Direction.NORTH
+    def counterclockwise_direction(self) -> Direction:
+        return COUNTERCLOCKWISE[self]
 
     @property
-    def counterclockwise_direction(self) -> Self:
-        match self:
-            case Direction.NORTH:
-                return Direction.WEST
-            case Direction.EAST:
-                return Direction.NORTH
-            case Direction.SOUTH:
-                return Direction.EAST
-            case Direction.WEST:
-                return Direction.SOUTH
+    def opposite_direction(self) -> Direction:
+        return OPPOSITE[self]
 
     @property
     def offset(self) -> tuple[int, int]:
-        match self:
-            case Direction.NORTH:
-                return (-1, 0)
-            case Direction.EAST:
-                return (0, 1)
-            case Direction.SOUTH:
-                return (1, 0)
-            case Direction.WEST:
-                return (0, -1)
+        return OFFSETS[self]
+
+    @property
+    def compass_direction(self) -> CompassDirection:
+        return CompassDirection(self * 2)
+
+    @classmethod
+    def offsets_array(cls) -> np.ndarray:
+        """(4, 2) array of row/column offsets, indexed by ordinal."""
+        return _offsets_array(OFFSETS)
+
+
+class CompassDirection(IntEnum):
+    """The eight compass directions, numbered clockwise from north."""
+
+    NORTH = 0
+    NORTHEAST = 1
+    EAST = 2
+    SOUTHEAST = 3
+    SOUTH = 4
+    SOUTHWEST = 5
+    WEST = 6
+    NORTHWEST = 7
+
+    @property
+    def clockwise_direction(self) -> CompassDirection:
+        return COMPASS_CLOCKWISE[self]
+
+    @property
+    def counterclockwise_direction(self) -> CompassDirection:
+        return COMPASS_COUNTERCLOCKWISE[self]
+
+    @property
+    def opposite_direction(self) -> CompassDirection:
+        return COMPASS_OPPOSITE[self]
+
+    @property
+    def offset(self) -> tuple[int, int]:
+        return COMPASS_OFFSETS[self]
+
+    @property
+    def is_diagonal(self) -> bool:
+        return self % 2 == 1
+
+    @classmethod
+    def offsets_array(cls) -> np.ndarray:
+        """(8, 2) array of row/column offsets, indexed by ordinal."""
+        return _offsets_array(COMPASS_OFFSETS)
+
+
+OFFSETS: tuple[tuple[int, int], ...] = ((-1, 0), (0, 1), (1, 0), (0, -1))
+CLOCKWISE = tuple(Direction((d + 1) % 4) for d in Direction)
+COUNTERCLOCKWISE = tuple(Direction((d - 1) % 4) for d in Direction)
+OPPOSITE = tuple(Direction((d + 2) % 4) for d in Direction)
+
+COMPASS_OFFSETS: tuple[tuple[int, int], ...] = (
+    (-1, 0),
+    (-1, 1),
+    (0, 1),
+    (1, 1),
+    (1, 0),
+    (1, -1),
+    (0, -1),
+    (-1, -1),
+)
+COMPASS_CLOCKWISE = tuple(CompassDirection((d + 1) % 8) for d in CompassDirection)
+COMPASS_COUNTERCLOCKWISE = tuple(
+    CompassDirection((d - 1) % 8) for d in CompassDirection
+)
+COMPASS_OPPOSITE = tuple(CompassDirection((d + 4) % 8) for d in CompassDirection)
+DIAGONAL_OFFSETS = COMPASS_OFFSETS[1::2]
+
+
+@cache
+def _offsets_array(offsets: tuple[tuple[int, int], ...]) -> np.ndarray:
+    import numpy as np
+
+    array = np.array(offsets, dtype=np.int64)
+    array.flags.writeable = False
+    return array
@@ -1,28 +1,92 @@
-from dataclasses import dataclass
+from array import array
+from dataclasses import InitVar, dataclass, field
+from functools import cached_property
 from typing import Iterator
 
-from common.position import Position
+from common.direction import COMPASS_OFFSETS, OFFSETS
+from common.position import PackedCoords, Position
+
+# Row/column offsets of the 4- and 8-neighborhoods, clockwise from north
+OFFSETS_4 = OFFSETS
+OFFSETS_8 = COMPASS_OFFSETS
 
 
 @dataclass
 class GridBase[T]:
-    grid: list[list[T]]
+    """
+    Rectangular grid addressable either by `Position` or by integer cell id
+    (`row * width + col`). Built from rows, but cell values are only kept in a
+    flat `cells` list, and neighbor tables map each cell id to the ids around it,
+    so hot loops can walk the grid on plain ints without allocating per cell.
+    """
+
+    grid: InitVar[list[list[T]]]
+    cells: list[T] = field(init=False, repr=False)
+    width: int = field(init=False)
+    height: int = field(init=False)
+
+    def __post_init__(self, grid: list[list[T]]):
+        self.height = len(grid)
+        self.width = len(grid[0]) if grid else 0
+        self.cells = [value for row in grid for value in row]
 
     def __getitem__(self, key: Position) -> T:
-        return self.grid[key.row][key.col]
+        if key not in self:
+            raise IndexError(f"{key} is outside the {self.height}x{self.width} grid")
+        return self.cells[key.row * self.width + key.col]
 
     def __contains__(self, position: Position) -> bool:
         return (0 <= position.row < self.height) and (0 <= position.col < self.width)
 
     def __iter__(self) -> Iterator[tuple[Position, T]]:
-        for row_idx, row in enumerate(self.grid):
-            for col_idx, value in enumerate(row):
-                yield Position(row_idx, col_idx), value
+        for idx, value in enumerate(self.cells):
+            yield self.position(idx), value
+
+    def __len__(self) -> int:
+        return len(self.cells)
+
+    @cached_property
+    def coords(self) -> PackedCoords:
+        return PackedCoords(width=self.width, height=self.height)
+
+    def index(self, position: Position) -> int:
+        return self.coords.pack_position(position)
+
+    def position(self, idx: int) -> Position:
+        return self.coords.unpack_position(idx)
+
+    def where(self, value: T) -> list[int]:
+        return [idx for idx, cell in enumerate(self.cells) if cell == value]
+
+    @cached_property
+    def neighbors_4(self) -> array:
+        """Neighbor ids in `OFFSETS_4` order at `idx * 4 + k`, -1 when off the grid."""
+        return self._neighbor_table(OFFSETS_4)
+
+    @cached_property
+    def neighbors_8(self) -> array:
+        """Neighbor ids in `OFFSETS_8` order at `idx * 8 + k`, -1 when off the grid."""
+        return self._neighbor_table(OFFSETS_8)
+
+    def neighbors(self, idx: int) -> Iterator[int]:
+        table = self.neighbors_4
+        for neighbor in table[idx * 4 : idx * 4 + 4]:
+            if neighbor >= 0:
+                yield neighbor
+
+    def _neighbor_table(self, offsets: tuple[tuple[int, int], ...]) -> array:
+        width, height = self.width, self.height
+        table = array("q", [-1]) * (len(self.cells) * len(offsets))
+
+        for k, (row_offset, col_offset) in enumerate(offsets):
+            # Only the rows/columns whose neighbor stays in bounds get filled in
+            rows = range(max(0, -row_offset), min(height, height - row_offset))
+            cols = range(max(0, -col_offset), min(width, width - col_offset))
+            delta = row_offset * width + col_offset
 
-    @property
-    def width(self) -> int:
-        return len(self.grid[0])
+            for row in rows:
+                for col in cols:
+                    idx = row * width + col
+                    table[idx * len(offsets) + k] = idx + delta
 
-    @property
-    def height(self) -> int:
-        return len(self.grid)
+        return table
@@ -2,6 +2,25 @@ import importlib
 from pathlib import Path
 
 
-def import_solutions(base_path: Path) -> None:
-    for module_path in base_path.glob("**/day_*.py"):
-        importlib.import_module(f"{base_path.name}.{module_path.stem}")
+def solutions_path(year: int) -> Path:
+    return Path(f"solutions_{year}")
+
+
+def solution_module_name(year: int, day: int) -> str:
+    return f"{solutions_path(year).name}.day_{day:02}"
+
+
+def available_days(year: int) -> list[int]:
+    """Lists the days that have a solution module, without importing any of them."""
+    days: list[int] = []
+    for module_path in solutions_path(year).glob("day_*.py"):
+        day = module_path.stem.removeprefix("day_")
+        if day.isdigit():
+            days.append(int(day))
+
+    return sorted(days)
+
+
+def import_solution(year: int, day: int) -> None:
+    # Registers the solution as a side effect of defining its class
+    importlib.import_module(solution_module_name(year, day))
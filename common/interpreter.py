@@ -1,6 +1,6 @@
 import re
 from dataclasses import dataclass
-from typing import TextIO, Protocol, Self, Iterator
+from typing import Iterable, Protocol, Self, Iterator
 
 
 class InstructionBase(Protocol):
@@ -52,12 +52,12 @@ class DontInstruction(InstructionBase):
 class InterpreterBase(Protocol):
     def handle(self, instruction: InstructionBase) -> None: ...
 
-    def run(self, infile: TextIO) -> None:
-        for instruction in self._instructions(infile):
+    def run(self, lines: Iterable[str]) -> None:
+        for instruction in self._instructions(lines):
             self.handle(instruction)
 
-    def _instructions(self, infile: TextIO) -> Iterator[InstructionBase]:
-        for line in infile:
+    def _instructions(self, lines: Iterable[str]) -> Iterator[InstructionBase]:
+        for line in lines:
             for match in re.finditer(self._tokenizer_pattern(), line):
                 yield self._instruction_from_match(match)
 
@@ -0,0 +1,83 @@
+import os
+from itertools import batched
+from math import ceil
+from typing import Any, Callable, Sequence, cast
+
+# Set in the parent right before forking, so workers inherit it through
+# copy-on-write memory instead of receiving a pickled copy per task.
+_shared: object = None
+
+# Worker count used by `fork_map` calls that don't ask for one
+_default_workers: int | None = None
+
+
+def set_default_workers(workers: int | None) -> None:
+    global _default_workers
+    _default_workers = workers
+
+
+def default_workers() -> int:
+    return _default_workers or os.cpu_count() or 1
+
+
+def can_fork() -> bool:
+    # Imported lazily, multiprocessing is slow to import and most runs never fork
+    import multiprocessing
+
+    # Daemonic workers (e.g. inside a `multiprocessing.Pool`) can't have children
+    return (
+        "fork" in multiprocessing.get_all_start_methods()
+        and not multiprocessing.current_process().daemon
+    )
+
+
+def _call_with_shared(args: tuple[Callable[[Any, Any], Any], Any]) -> Any:
+    fn, item = args
+    return fn(_shared, item)
+
+
+def fork_map[TShared, TItem, TResult](
+    fn: Callable[[TShared, TItem], TResult],
+    shared: TShared,
+    items: Sequence[TItem],
+    *,
+    workers: int | None = None,
+) -> list[TResult]:
+    """
+    Computes `fn(shared, item)` for every item, in forked worker processes when
+    more than one worker is requested (`default_workers()` when not given).
+    `fn` and the items are pickled, `shared` is not.
+    """
+    global _shared
+
+    workers = min(workers or default_workers(), len(items))
+    if workers <= 1 or not can_fork():
+        return [fn(shared, item) for item in items]
+
+    import multiprocessing
+
+    _shared = shared
+    try:
+        with multiprocessing.get_context("fork").Pool(workers) as pool:
+            results = pool.map(_call_with_shared, [(fn, item) for item in items])
+            return cast(list[TResult], results)
+    finally:
+        _shared = None
+
+
+def fork_map_batched[TShared, TItem, TResult](
+    fn: Callable[[TShared, tuple[TItem, ...]], TResult],
+    shared: TShared,
+    items: Sequence[TItem],
+    *,
+    min_batch_size: int,
+    workers: int | None = None,
+) -> list[TResult]:
+    """
+    Like `fork_map`, but calls `fn` once per batch of items. There are about four
+    batches per worker so uneven ones even out, and none smaller than
+    `min_batch_size`, below which forking isn't worth it.
+    """
+    workers = workers or default_workers()
+    batch_size = max(min_batch_size, ceil(len(items) / (workers * 4)))
+    return fork_map(fn, shared, list(batched(items, batch_size)), workers=workers)
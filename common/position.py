@@ -7,7 +7,7 @@ if TYPE_CHECKING:
     import numpy as np
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Position:
     row: int
     col: int
@@ -30,3 +30,54 @@ class Position:
                     continue
 
                 yield self.with_offset((row_offset, col_offset)), distance
+
+
+@dataclass(frozen=True, slots=True)
+class PackedCoords:
+    """
+    Encodes in-bounds (row, col) pairs of a `height` x `width` grid as the int
+    `row * width + col`, so large sets of positions can be kept in plain int
+    sets, lists or arrays instead of as `Position` objects.
+    """
+
+    width: int
+    height: int
+
+    def __len__(self) -> int:
+        return self.width * self.height
+
+    def pack(self, row: int, col: int) -> int:
+        return row * self.width + col
+
+    def unpack(self, idx: int) -> tuple[int, int]:
+        return divmod(idx, self.width)
+
+    def pack_position(self, position: Position) -> int:
+        return position.row * self.width + position.col
+
+    def unpack_position(self, idx: int) -> Position:
+        return Position(*divmod(idx, self.width))
+
+    def in_bounds(self, row: int, col: int) -> bool:
+        return 0 <= row < self.height and 0 <= col < self.width
+
+    def offset(self, idx: int, offset: tuple[int, int]) -> int | None:
+        """Packed neighbor at `offset` from `idx`, or None when off the grid."""
+        row, col = divmod(idx, self.width)
+        row += offset[0]
+        col += offset[1]
+        if 0 <= row < self.height and 0 <= col < self.width:
+            return row * self.width + col
+        return None
+
+    def neighbors(self, idx: int) -> Iterator[int]:
+        """In-bounds 4-neighbors of `idx`, clockwise from north."""
+        row, col = divmod(idx, self.width)
+        if row > 0:
+            yield idx - self.width
+        if col < self.width - 1:
+            yield idx + 1
+        if row < self.height - 1:
+            yield idx + self.width
+        if col > 0:
+            yield idx - 1
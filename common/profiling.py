@@ -0,0 +1,100 @@
+import cProfile
+import io
+import pstats
+import signal
+import sys
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+from types import CodeType, FrameType
+from typing import Callable
+
+from common.runner import RunResult, format_duration
+
+
+@dataclass
+class StackSampler:
+    """
+    Samples the call stack of the main thread on a CPU-time timer, counting
+    stacks in the collapsed format flamegraph tools read. Samples are taken in a
+    signal handler rather than another thread, since cProfile would otherwise
+    record the sampling thread's own calls.
+    """
+
+    interval_seconds: float = 0.001
+    stacks: Counter[tuple[tuple[CodeType, int], ...]] = field(default_factory=Counter)
+
+    def __enter__(self) -> "StackSampler":
+        signal.signal(signal.SIGPROF, self._sample)
+        signal.setitimer(
+            signal.ITIMER_PROF, self.interval_seconds, self.interval_seconds
+        )
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        signal.setitimer(signal.ITIMER_PROF, 0)
+        signal.signal(signal.SIGPROF, signal.SIG_DFL)
+
+    def write_collapsed(self, path: Path) -> None:
+        lines: list[str] = []
+        for stack, count in self.stacks.items():
+            labels = (
+                f"{code.co_qualname} ({Path(code.co_filename).name}:{lineno})"
+                for code, lineno in reversed(stack)
+            )
+            lines.append(f"{';'.join(labels)} {count}\n")
+
+        path.write_text("".join(lines))
+
+    def _sample(self, signum: int, frame: FrameType | None) -> None:
+        # Keep the handler cheap, labels are only formatted when writing out
+        stack: list[tuple[CodeType, int]] = []
+        while frame is not None:
+            stack.append((frame.f_code, frame.f_lineno))
+            frame = frame.f_back
+
+        self.stacks[tuple(stack)] += 1
+
+
+def profile_cpu[T](fn: Callable[[], T], output_prefix: Path) -> T:
+    """
+    Runs `fn` under cProfile and a stack sampler, writing `<prefix>.pstats` and a
+    flamegraph-ready `<prefix>.collapsed` file.
+    """
+    output_prefix.parent.mkdir(parents=True, exist_ok=True)
+    profiler = cProfile.Profile()
+    sampler = StackSampler()
+
+    if hasattr(signal, "setitimer"):
+        with sampler:
+            result = profiler.runcall(fn)
+    else:
+        result = profiler.runcall(fn)
+
+    pstats_path = output_prefix.with_suffix(".pstats")
+    collapsed_path = output_prefix.with_suffix(".collapsed")
+    profiler.dump_stats(pstats_path)
+    sampler.write_collapsed(collapsed_path)
+
+    summary = io.StringIO()
+    pstats.Stats(profiler, stream=summary).sort_stats("cumulative").print_stats(15)
+    print(summary.getvalue(), file=sys.stderr)
+    print(f"Wrote {pstats_path} and {collapsed_path}", file=sys.stderr)
+
+    return result
+
+
+def format_phases(result: RunResult) -> str:
+    phases = [("parse_input", result.parse_seconds)] + [
+        (f"part {part_result.part}", part_result.solve_seconds)
+        for part_result in result.parts
+    ]
+    total_seconds = sum(seconds for _, seconds in phases)
+
+    lines = [f"Day {result.task.day} phases:"]
+    for name, seconds in phases:
+        share = seconds / total_seconds * 100 if total_seconds else 0.0
+        lines.append(f"  {name:<12} {format_duration(seconds):>10}  {share:5.1f}%")
+    lines.append(f"  {'total':<12} {format_duration(total_seconds):>10}")
+
+    return "\n".join(lines)
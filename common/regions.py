@@ -0,0 +1,149 @@
+from dataclasses import dataclass
+from itertools import chain
+from typing import Hashable, Iterable, Iterator, Sequence
+
+from common.union_find import find_root
+
+
+@dataclass
+class RegionStats[T: Hashable]:
+    """Shape of one region of equal, orthogonally connected cells."""
+
+    value: T
+    area: int = 0
+    perimeter: int = 0
+    # Equal to the number of straight sides of the region, holes included
+    corners: int = 0
+
+    def merge(self, other: "RegionStats[T]") -> None:
+        self.area += other.area
+        self.perimeter += other.perimeter
+        self.corners += other.corners
+
+
+def label_regions[T: Hashable](rows: Iterable[Sequence[T]]) -> Iterator[RegionStats[T]]:
+    """
+    Finds the regions of a grid given row by row, yielding each region's stats
+    as soon as no later row can extend it. Cells are labeled with a union-find
+    over the previous and the current row only, so memory is proportional to
+    the grid's width rather than its area. Corners are counted on each 2x2
+    window of cells, padded with `None` outside the grid.
+    """
+    parents: dict[int, int] = {}
+    stats: dict[int, RegionStats[T]] = {}
+    next_label = 0
+
+    def union(a: int, b: int) -> int:
+        a, b = find_root(parents, a), find_root(parents, b)
+        if a == b:
+            return a
+        if stats[a].area < stats[b].area:
+            a, b = b, a
+
+        parents[b] = a
+        stats[a].merge(stats.pop(b))
+        return a
+
+    # Rows are padded with `None` on both ends, and the grid with a row of
+    # `None` above and below, so edges need no bounds checks
+    previous_cells: list[T | None] = []
+    previous_labels: list[int] = []
+
+    for row in chain(rows, [None]):
+        if row is None:
+            cells: list[T | None] = [None] * len(previous_cells)
+        else:
+            cells = [None, *row, None]
+        if not previous_cells:
+            previous_cells = [None] * len(cells)
+            previous_labels = [0] * len(cells)
+
+        width = len(cells) - 2
+        labels = [0] * len(cells)
+
+        for col in range(1, width + 1):
+            value = cells[col]
+            if value is None:
+                continue
+
+            left, up = cells[col - 1], previous_cells[col]
+            label = None
+            if left == value:
+                label = find_root(parents, labels[col - 1])
+            if up == value:
+                up_label = previous_labels[col]
+                label = up_label if label is None else union(label, up_label)
+
+            if label is None:
+                label = next_label
+                next_label += 1
+                parents[label] = label
+                stats[label] = RegionStats(value)
+
+            labels[col] = label = find_root(parents, label)
+            region = stats[label]
+            region.area += 1
+
+            # Edges on the left, right and top, the bottom one is counted with
+            # the next row
+            region.perimeter += (
+                (left != value) + (cells[col + 1] != value) + (up != value)
+            )
+
+        for col in range(1, width + 1):
+            value = previous_cells[col]
+            if value is not None and cells[col] != value:
+                stats[find_root(parents, previous_labels[col])].perimeter += 1
+
+        # Windows straddling the previous and current rows, one per vertex
+        for col in range(width + 1):
+            top_left, top_right = previous_cells[col], previous_cells[col + 1]
+            bottom_left, bottom_right = cells[col], cells[col + 1]
+            if top_left == top_right == bottom_left == bottom_right:
+                continue
+
+            if top_left is not None and _is_corner(
+                top_left, top_right, bottom_left, bottom_right
+            ):
+                stats[find_root(parents, previous_labels[col])].corners += 1
+            if top_right is not None and _is_corner(
+                top_right, top_left, bottom_right, bottom_left
+            ):
+                stats[find_root(parents, previous_labels[col + 1])].corners += 1
+            if bottom_left is not None and _is_corner(
+                bottom_left, bottom_right, top_left, top_right
+            ):
+                stats[find_root(parents, labels[col])].corners += 1
+            if bottom_right is not None and _is_corner(
+                bottom_right, bottom_left, top_right, top_left
+            ):
+                stats[find_root(parents, labels[col + 1])].corners += 1
+
+        # Regions missing from the current row are complete
+        labels = [
+            find_root(parents, label) if value is not None else 0
+            for label, value in zip(labels, cells)
+        ]
+        live_labels = {
+            label for label, value in zip(labels, cells) if value is not None
+        }
+        for label in [label for label in stats if label not in live_labels]:
+            yield stats.pop(label)
+
+        # Only the current row's roots are needed from here on
+        parents = {label: label for label in live_labels}
+        previous_cells, previous_labels = cells, labels
+
+
+def _is_corner(
+    cell: object, horizontal: object, vertical: object, diagonal: object
+) -> bool:
+    """
+    Whether the vertex a 2x2 window is centered on is a corner of `cell`'s
+    region, given its horizontal, vertical and diagonal neighbors in the window.
+    """
+    if horizontal != cell and vertical != cell:
+        # Outside corner
+        return True
+    # Inside corner
+    return horizontal == cell and vertical == cell and diagonal != cell
@@ -0,0 +1,176 @@
+import io
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from time import perf_counter
+from typing import Iterable
+
+from common.cache import DiskCache
+from common.import_solutions import solutions_path
+from common.parallel import fork_map, set_default_workers
+from common.solution import SolutionBase
+
+
+@dataclass(kw_only=True, frozen=True)
+class RunTask:
+    year: int
+    day: int
+    part: SolutionBase.Part
+    input_path: Path
+    parallel_parts: bool = False
+    parse_cache: DiskCache | None = None
+    answer_cache: DiskCache | None = None
+
+
+@dataclass(kw_only=True, frozen=True)
+class PartResult:
+    part: SolutionBase.Part
+    answer: object
+    solve_seconds: float
+    from_cache: bool = False
+
+
+@dataclass(kw_only=True, frozen=True)
+class RunResult:
+    task: RunTask
+    parse_seconds: float
+    wall_seconds: float
+    parts: list[PartResult]
+
+
+def default_input_path(year: int, day: int) -> Path:
+    return solutions_path(year) / "inputs" / f"{day:02}"
+
+
+def parse_day_ranges(value: str) -> list[int]:
+    """Parses day specs such as `1-12` or `1,3,5-7` into a sorted list of days."""
+    days: set[int] = set()
+    for chunk in value.split(","):
+        start, _, end = chunk.strip().partition("-")
+        first = int(start)
+        last = int(end) if end else first
+        if first > last:
+            raise ValueError(f"Invalid day range: {chunk}")
+
+        days.update(range(first, last + 1))
+
+    return sorted(days)
+
+
+def _solve_part_timed(
+    shared: tuple[SolutionBase[object], object], part: SolutionBase.Part
+) -> PartResult:
+    solution, parsed_input = shared
+
+    start = perf_counter()
+    answer = solution.solve_part(parsed_input, part)
+    return PartResult(part=part, answer=answer, solve_seconds=perf_counter() - start)
+
+
+def run_task(task: RunTask) -> RunResult:
+    solution = SolutionBase.get_solution(task.year, task.day)
+    parts = task.part.individual_parts
+
+    wall_start = perf_counter()
+    part_results: dict[SolutionBase.Part, PartResult] = {}
+
+    input_text = None
+    if task.answer_cache is not None:
+        input_text = task.input_path.read_text()
+        for part in parts:
+            key = solution.cache_key("answer", input_text, part)
+            found, answer = task.answer_cache.get(key)
+            if found:
+                part_results[part] = PartResult(
+                    part=part, answer=answer, solve_seconds=0.0, from_cache=True
+                )
+
+    # Only parse when some part actually has to be solved
+    pending_parts = [part for part in parts if part not in part_results]
+    parse_seconds = 0.0
+    if pending_parts:
+        with open(task.input_path, "r") as infile:
+            if input_text is not None:
+                infile = io.StringIO(input_text)
+
+            parse_start = perf_counter()
+            parsed_input = solution.parse_input_cached(infile, task.parse_cache)
+            parse_seconds = perf_counter() - parse_start
+
+        for result in fork_map(
+            _solve_part_timed,
+            (solution, parsed_input),
+            pending_parts,
+            workers=len(pending_parts) if task.parallel_parts else 1,
+        ):
+            part_results[result.part] = result
+            if task.answer_cache is not None and input_text is not None:
+                key = solution.cache_key("answer", input_text, result.part)
+                task.answer_cache.put(key, result.answer)
+
+    return RunResult(
+        task=task,
+        parse_seconds=parse_seconds,
+        wall_seconds=perf_counter() - wall_start,
+        parts=[part_results[part] for part in parts],
+    )
+
+
+def run_tasks(tasks: Iterable[RunTask], workers: int | None = None) -> list[RunResult]:
+    tasks = list(tasks)
+    workers = min(workers or os.cpu_count() or 1, len(tasks) or 1)
+
+    if workers == 1:
+        results = [run_task(task) for task in tasks]
+    else:
+        # Imported here so single-day runs don't pay for it at startup
+        from concurrent.futures import ProcessPoolExecutor
+
+        # The pool already keeps every core busy, so solutions that fork their
+        # own workers run them serially instead of multiplying the processes
+        with ProcessPoolExecutor(
+            max_workers=workers, initializer=set_default_workers, initargs=(1,)
+        ) as executor:
+            results = list(executor.map(run_task, tasks))
+
+    return sorted(results, key=lambda r: (r.task.year, r.task.day))
+
+
+def format_duration(seconds: float) -> str:
+    if seconds < 1:
+        return f"{seconds * 1000:.1f} ms"
+    return f"{seconds:.2f} s"
+
+
+def format_results(results: list[RunResult]) -> str:
+    headers = ("Year", "Day", "Part", "Answer", "Wall", "Parse", "Solve")
+    rows: list[tuple[str, ...]] = []
+    for result in results:
+        for idx, part_result in enumerate(result.parts):
+            # Input is parsed once per task, however many parts run on it
+            is_first_part = idx == 0
+            rows.append(
+                (
+                    str(result.task.year),
+                    str(result.task.day),
+                    str(part_result.part),
+                    str(part_result.answer),
+                    format_duration(result.wall_seconds) if is_first_part else "",
+                    format_duration(result.parse_seconds) if is_first_part else "",
+                    (
+                        "cached"
+                        if part_result.from_cache
+                        else format_duration(part_result.solve_seconds)
+                    ),
+                )
+            )
+
+    widths = [
+        max(len(row[idx]) for row in (headers, *rows)) for idx in range(len(headers))
+    ]
+    lines = [
+        "  ".join(cell.rjust(width) for cell, width in zip(row, widths))
+        for row in (headers, *rows)
+    ]
+    lines.insert(1, "  ".join("-" * width for width in widths))
+    return "\n".join(lines)
@@ -1,7 +1,12 @@
 from dataclasses import dataclass
 from enum import StrEnum
+import io
 from typing import ClassVar, Protocol, TextIO
 
+from common.cache import DiskCache, content_digest, solution_source_digest
+from common.import_solutions import import_solution
+from common.parallel import fork_map
+
 
 @dataclass(kw_only=True, frozen=True)
 class RegistryKey:
@@ -11,10 +16,18 @@ class RegistryKey:
 
 class SolutionBase[TParsed](Protocol):
     _registry: "ClassVar[dict[RegistryKey, SolutionBase[object]]]" = {}
+    registry_key: ClassVar[RegistryKey]
 
     class Part(StrEnum):
         ONE = "one"
         TWO = "two"
+        BOTH = "both"
+
+        @property
+        def individual_parts(self) -> "list[SolutionBase.Part]":
+            if self is SolutionBase.Part.BOTH:
+                return [SolutionBase.Part.ONE, SolutionBase.Part.TWO]
+            return [self]
 
     def __init_subclass__(cls, year: int, day: int):
         registry_key = RegistryKey(year=year, day=day)
@@ -23,10 +36,14 @@ class SolutionBase[TParsed](Protocol):
         ), f"A solution already exists for day {day}, year {year}"
 
         cls._registry[registry_key] = cls  # type: ignore
+        cls.registry_key = registry_key
 
     @classmethod
     def get_solution(cls, year: int, day: int) -> "SolutionBase[object]":
         registry_key = RegistryKey(year=year, day=day)
+        if registry_key not in cls._registry:
+            import_solution(year, day)
+
         return cls._registry[registry_key]
 
     @classmethod
@@ -39,11 +56,94 @@ class SolutionBase[TParsed](Protocol):
     def part_02(cls, parsed_input: TParsed) -> object: ...
 
     @classmethod
-    def solve(cls, infile: TextIO, part: Part) -> object:
-        parsed_input = cls.parse_input(infile)
+    def parse_input_cached(cls, infile: TextIO, cache: DiskCache | None) -> TParsed:
+        """
+        Like `parse_input`, but reuses a previous parse of the same input by the
+        same version of the solution module when a cache is given.
+        """
+        if cache is None:
+            return cls.parse_input(infile)
+
+        input_text = infile.read()
+        key = cls.cache_key("parsed", input_text)
+
+        found, parsed_input = cache.get(key)
+        if found:
+            return parsed_input  # type: ignore
 
+        parsed_input = cls.parse_input(io.StringIO(input_text))
+        cache.put(key, parsed_input)
+        return parsed_input
+
+    @classmethod
+    def cache_key(cls, kind: str, input_text: str, *extra: str) -> str:
+        """
+        Identifies a cached parse or answer for this solution and input. Keys
+        include the source of the solution module and of the `common` package, so
+        editing either invalidates both kinds of entries.
+        """
+        return "-".join(
+            (
+                kind,
+                str(cls.registry_key.year),
+                str(cls.registry_key.day),
+                *extra,
+                solution_source_digest(cls.__module__),
+                content_digest(input_text),
+            )
+        )
+
+    @classmethod
+    def solve(
+        cls,
+        infile: TextIO,
+        part: Part,
+        *,
+        cache: DiskCache | None = None,
+        answer_cache: DiskCache | None = None,
+    ) -> object:
+        if answer_cache is None:
+            parsed_input = cls.parse_input_cached(infile, cache)
+            return cls.solve_part(parsed_input, part)
+
+        input_text = infile.read()
+        key = cls.cache_key("answer", input_text, part)
+
+        found, answer = answer_cache.get(key)
+        if found:
+            return answer
+
+        parsed_input = cls.parse_input_cached(io.StringIO(input_text), cache)
+        answer = cls.solve_part(parsed_input, part)
+        answer_cache.put(key, answer)
+        return answer
+
+    @classmethod
+    def solve_all(
+        cls,
+        infile: TextIO,
+        *,
+        parallel: bool = False,
+        cache: DiskCache | None = None,
+    ) -> dict[Part, object]:
+        """
+        Parses the input once and runs both parts on it. With `parallel`, each part
+        runs in its own forked process that shares the parsed input.
+        """
+        parsed_input = cls.parse_input_cached(infile, cache)
+        parts = cls.Part.BOTH.individual_parts
+        answers = fork_map(
+            cls.solve_part, parsed_input, parts, workers=len(parts) if parallel else 1
+        )
+
+        return dict(zip(parts, answers))
+
+    @classmethod
+    def solve_part(cls, parsed_input: TParsed, part: Part) -> object:
         match part:
             case cls.Part.ONE:
                 return cls.part_01(parsed_input)
             case cls.Part.TWO:
                 return cls.part_02(parsed_input)
+            case _:
+                raise ValueError(f"Can't solve {part} as a single part")
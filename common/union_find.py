@@ -0,0 +1,8 @@
+def find_root(parents: list[int] | dict[int, int], label: int) -> int:
+    """
+    Root of `label` in a union-find forest stored as each label's parent, halving
+    the path to it along the way.
+    """
+    while (parent := parents[label]) != label:
+        parents[label] = label = parents[parent]
+    return label
@@ -1,26 +1,222 @@
 from pathlib import Path
+from time import perf_counter
 import click
+from common.cache import DEFAULT_CACHE_PATH, DiskCache, set_state_dir
 from common.solution import SolutionBase
-from common.import_solutions import import_solutions
-from typing import TextIO
+from common.import_solutions import available_days
+from common.parallel import set_default_workers
+from common.profiling import format_phases, profile_cpu
+from common.runner import (
+    RunResult,
+    RunTask,
+    default_input_path,
+    format_duration,
+    format_results,
+    parse_day_ranges,
+    run_task,
+    run_tasks,
+)
+
+
+def _parse_days_option(
+    ctx: click.Context, param: click.Parameter, value: str | None
+) -> list[int] | None:
+    if value is None:
+        return None
+
+    try:
+        return parse_day_ranges(value)
+    except ValueError as e:
+        raise click.BadParameter(str(e)) from e
+
+
+def _report_answer_cache(results: list[RunResult], answers: DiskCache | None):
+    if answers is None:
+        return
+
+    # Tasks may have run in other processes, so count hits from the results
+    part_results = [part for result in results for part in result.parts]
+    hits = sum(part.from_cache for part in part_results)
+    click.echo(
+        f"Answer cache: {hits} hits, {len(part_results) - hits} misses", err=True
+    )
 
 
 @click.command()
 @click.option("--year", type=int, default=2024)
-@click.option("--day", type=int, required=True)
-@click.option("--part", type=click.Choice(list(SolutionBase.Part)), required=True)
-@click.option("--input", type=click.File("r"))
-def main(year: int, day: int, part: SolutionBase.Part, input: TextIO | None):
-    base_path = Path(f"solutions_{year}")
-    import_solutions(base_path)
+@click.option("--day", type=int)
+@click.option("--days", callback=_parse_days_option, help="e.g. 1-12 or 1,3,5-7")
+@click.option("--all", "run_all", is_flag=True, help="Run every registered day.")
+@click.option("--part", type=click.Choice(list(SolutionBase.Part)))
+@click.option("--input", type=click.Path(exists=True, dir_okay=False, path_type=Path))
+@click.option(
+    "--workers",
+    type=int,
+    help="Process pool size, defaults to CPU count. With --day, caps the "
+    "processes a solution may fork internally; pooled days don't fork.",
+)
+@click.option(
+    "--parallel-parts",
+    is_flag=True,
+    help="With --part both, run both parts in forked processes.",
+)
+@click.option(
+    "--no-cache",
+    is_flag=True,
+    help="Always re-parse the input, and don't keep solution state on disk.",
+)
+@click.option(
+    "--cache-dir", type=click.Path(path_type=Path), default=DEFAULT_CACHE_PATH
+)
+@click.option("--cache-size-mb", type=int, default=512, help="Cache size cap.")
+@click.option(
+    "--answer-cache",
+    is_flag=True,
+    help="Reuse answers computed earlier for the same input and solution source.",
+)
+@click.option(
+    "--profile",
+    type=click.Choice(["cpu", "phases"]),
+    help="With --day, profile the solve with caches disabled.",
+)
+@click.option(
+    "--profile-dir", type=click.Path(path_type=Path), default=Path(".profiles")
+)
+def main(
+    year: int,
+    day: int | None,
+    days: list[int] | None,
+    run_all: bool,
+    part: SolutionBase.Part | None,
+    input: Path | None,
+    workers: int | None,
+    parallel_parts: bool,
+    no_cache: bool,
+    cache_dir: Path,
+    cache_size_mb: int,
+    answer_cache: bool,
+    profile: str | None,
+    profile_dir: Path,
+):
+    if sum((day is not None, days is not None, run_all)) != 1:
+        raise click.UsageError("Pass exactly one of --day, --days or --all.")
+
+    if profile is not None and day is None:
+        raise click.UsageError("--profile can only be used with --day.")
+
+    parse_cache = None
+    if not no_cache:
+        parse_cache = DiskCache(
+            path=cache_dir / "parsed", max_bytes=cache_size_mb * 1024 * 1024
+        )
+        if profile is None:
+            set_state_dir(cache_dir / "state")
+
+    answers = None
+    if answer_cache:
+        answers = DiskCache(
+            path=cache_dir / "answers", max_bytes=cache_size_mb * 1024 * 1024
+        )
+
+    if day is not None:
+        if part is None:
+            raise click.UsageError("--part is required with --day.")
+
+        if input is None:
+            input = default_input_path(year, day)
+
+        set_default_workers(workers)
+
+        if profile == "phases":
+            result = run_task(RunTask(year=year, day=day, part=part, input_path=input))
+            print(format_results([result]))
+            print()
+            print(format_phases(result))
+            return
+
+        if profile == "cpu":
+            solution = SolutionBase.get_solution(year, day)
+            output_prefix = profile_dir / f"{year}_{day:02}_{part}"
+            with open(input, "r") as infile:
+                if part is SolutionBase.Part.BOTH:
+                    answers_by_part = profile_cpu(
+                        lambda: solution.solve_all(infile), output_prefix
+                    )
+                    for solved_part, answer in answers_by_part.items():
+                        print(f"{solved_part}: {answer}")
+                else:
+                    print(
+                        profile_cpu(lambda: solution.solve(infile, part), output_prefix)
+                    )
+            return
+
+        if part is SolutionBase.Part.BOTH:
+            task = RunTask(
+                year=year,
+                day=day,
+                part=part,
+                input_path=input,
+                parallel_parts=parallel_parts,
+                parse_cache=parse_cache,
+                answer_cache=answers,
+            )
+            results = [run_task(task)]
+            print(format_results(results))
+            _report_answer_cache(results, answers)
+            return
+
+        solution = SolutionBase.get_solution(year, day)
+        with open(input, "r") as infile:
+            answer = solution.solve(
+                infile, part, cache=parse_cache, answer_cache=answers
+            )
+
+        print(answer)
+        if answers is not None:
+            click.echo(
+                f"Answer cache: {answers.hits} hits, {answers.misses} misses", err=True
+            )
+        return
+
+    if input is not None:
+        raise click.UsageError("--input can only be used with --day.")
+
+    registered_days = available_days(year)
+    if days is not None:
+        registered_days = [d for d in registered_days if d in days]
+
+    tasks: list[RunTask] = []
+    for registered_day in registered_days:
+        input_path = default_input_path(year, registered_day)
+        if not input_path.exists():
+            click.echo(
+                f"Skipping day {registered_day}: no input at {input_path}", err=True
+            )
+            continue
 
-    if input is None:
-        input = open(base_path / "inputs" / f"{day:02}", "r")
+        for task_part in [part] if part else SolutionBase.Part.BOTH.individual_parts:
+            tasks.append(
+                RunTask(
+                    year=year,
+                    day=registered_day,
+                    part=task_part,
+                    input_path=input_path,
+                    parse_cache=parse_cache,
+                    answer_cache=answers,
+                )
+            )
 
-    solution = SolutionBase.get_solution(year, day)
-    answer = solution.solve(input, part)
+    start = perf_counter()
+    results = run_tasks(tasks, workers=workers)
+    elapsed = perf_counter() - start
 
-    print(answer)
+    print(format_results(results))
+    print()
+    print(
+        f"Total: {format_duration(elapsed)} wall, "
+        f"{format_duration(sum(r.wall_seconds for r in results))} across tasks"
+    )
+    _report_answer_cache(results, answers)
 
 
 if __name__ == "__main__":
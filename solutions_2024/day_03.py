@@ -10,7 +10,7 @@ from common.interpreter import (
 from common.solution import SolutionBase
 
 
-TParsed = TextIO
+TParsed = list[str]
 
 
 class Part01Interpreter(InterpreterBase):
@@ -46,7 +46,7 @@ class Part02Interpreter(InterpreterBase):
 class Solution(SolutionBase[TParsed], year=2024, day=3):
     @classmethod
     def parse_input(cls, infile: TextIO) -> TParsed:
-        return infile
+        return infile.readlines()
 
     @classmethod
     def part_01(cls, parsed_input: TParsed) -> int:
@@ -2,11 +2,10 @@ from dataclasses import dataclass
 from typing import TextIO
 from itertools import product
 
+from common.direction import COMPASS_OFFSETS
 from common.solution import SolutionBase
 
-
 TARGET_TEXT = "XMAS"
-DIRECTIONS = [(-1, -1), (0, -1), (1, -1), (1, 0), (1, 1), (0, 1), (-1, 1), (-1, 0)]
 
 
 @dataclass
@@ -44,7 +43,7 @@ class Solution(SolutionBase[TParsed], year=2024, day=4):
     def part_01(cls, parsed_input: TParsed) -> int:
         total = 0
         for row, col in product(range(parsed_input.height), range(parsed_input.width)):
-            for direction in DIRECTIONS:
+            for direction in COMPASS_OFFSETS:
                 if cls.search(
                     parsed_input, SearchState(row=row, col=col, text=""), direction
                 ):
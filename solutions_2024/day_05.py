@@ -1,6 +1,6 @@
 from collections import defaultdict
-from dataclasses import dataclass
-from functools import cmp_to_key
+from dataclasses import dataclass, field
+from itertools import pairwise
 from typing import Mapping, Self, TextIO
 
 from common.solution import SolutionBase
@@ -8,24 +8,54 @@ from common.solution import SolutionBase
 
 @dataclass
 class PageRules:
+    """
+    Besides the rules themselves, each page gets a bit, and `preceding_pages`
+    holds the bitmask of pages that must come before it. Within an update, the
+    number of its pages that must come first is where a page belongs.
+    """
+
     rules: Mapping[int, set[int]]
+    ordered_pairs: set[tuple[int, int]] = field(init=False, repr=False, compare=False)
+    page_bits: dict[int, int] = field(init=False, repr=False, compare=False)
+    preceding_pages: dict[int, int] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        pages = set(self.rules).union(*self.rules.values())
+        self.page_bits = {page: 1 << i for i, page in enumerate(sorted(pages))}
+
+        # A page next to itself is in order too
+        self.ordered_pairs = {(page, page) for page in pages}
+        self.preceding_pages = defaultdict(int)
+        for before, afters in self.rules.items():
+            for after in afters:
+                self.ordered_pairs.add((before, after))
+                self.preceding_pages[after] |= self.page_bits[before]
 
-    def page_comparator(self, a: int, b: int) -> int:
-        if a == b:
-            return 0
-        elif b in self.rules[a]:
-            return -1
-        else:
-            return 1
+    def is_ordered(self, pages: list[int]) -> bool:
+        return all(map(self.ordered_pairs.__contains__, pairwise(pages)))
+
+    def ranks(self, pages: list[int]) -> dict[int, int]:
+        """How many of `pages` must come before each of them."""
+        pages_mask = 0
+        for page in pages:
+            pages_mask |= self.page_bits.get(page, 0)
+
+        return {
+            page: (self.preceding_pages.get(page, 0) & pages_mask).bit_count()
+            for page in pages
+        }
 
 
 @dataclass
 class Update:
     pages: list[int]
 
+    def is_sorted(self, rules: PageRules) -> bool:
+        return rules.is_ordered(self.pages)
+
     def to_sorted(self, rules: PageRules) -> Self:
-        sorted_pages = sorted(self.pages, key=cmp_to_key(rules.page_comparator))
-        return Update(pages=sorted_pages)
+        ranks = rules.ranks(self.pages)
+        return Update(pages=sorted(self.pages, key=ranks.__getitem__))
 
     def midpoint_value(self) -> int:
         mid_idx = len(self.pages) // 2
@@ -50,8 +80,7 @@ class Solution(SolutionBase[TParsed], year=2024, day=5):
             rules[int(x)].add(int(y))
 
         for line in infile_iter:
-            pages = line.strip().split(",")
-            updates.append(Update(pages=[int(p) for p in pages]))
+            updates.append(Update(pages=list(map(int, line.split(",")))))
 
         return PageRules(rules=rules), updates
 
@@ -60,7 +89,7 @@ class Solution(SolutionBase[TParsed], year=2024, day=5):
         total = 0
         page_dependencies, updates = parsed_input
         for update in updates:
-            if update == update.to_sorted(page_dependencies):
+            if update.is_sorted(page_dependencies):
                 total += update.midpoint_value()
 
         return total
@@ -70,8 +99,7 @@ class Solution(SolutionBase[TParsed], year=2024, day=5):
         total = 0
         page_dependencies, updates = parsed_input
         for update in updates:
-            sorted_update = update.to_sorted(page_dependencies)
-            if update != update.to_sorted(page_dependencies):
-                total += sorted_update.midpoint_value()
+            if not update.is_sorted(page_dependencies):
+                total += update.to_sorted(page_dependencies).midpoint_value()
 
         return total
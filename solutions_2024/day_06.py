@@ -1,147 +1,187 @@
-from copy import deepcopy
-from dataclasses import dataclass
-from enum import Enum, auto
-from typing import Self, TextIO
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass, field
+from typing import Iterator, TextIO
 
+from common.direction import CLOCKWISE, OFFSETS, Direction
+from common.parallel import fork_map_batched
 from common.solution import SolutionBase
 
+GuardState = tuple[int, int, Direction]
+# An obstruction to try, with the guard's state right before reaching it
+Candidate = tuple[GuardState, tuple[int, int]]
 
-class Direction(Enum):
-    NORTH = auto()
-    EAST = auto()
-    SOUTH = auto()
-    WEST = auto()
 
-    @property
-    def clockwise_direction(self) -> Self:
-        match self:
-            case Direction.NORTH:
-                return Direction.EAST
-            case Direction.EAST:
-                return Direction.SOUTH
-            case Direction.SOUTH:
-                return Direction.WEST
-            case Direction.WEST:
-                return Direction.NORTH
+@dataclass
+class LabMap:
+    """
+    Obstructions are indexed both as a set of `row * width + col` ids, for
+    stepping one cell at a time, and as sorted per-row and per-column lists, so
+    the guard can jump straight to the next obstruction in its path.
+    """
+
+    width: int
+    height: int
+    start: tuple[int, int]
+    obstructions: set[int] = field(default_factory=set)
+    row_obstructions: list[list[int]] = field(default_factory=list)
+    col_obstructions: list[list[int]] = field(default_factory=list)
+
+    def patrol(self) -> Iterator[GuardState]:
+        """Every state of the guard's route, one step or turn at a time."""
+        row, col = self.start
+        direction = Direction.NORTH
+
+        while True:
+            yield row, col, direction
+
+            row_offset, col_offset = OFFSETS[direction]
+            next_row, next_col = row + row_offset, col + col_offset
+            if not (0 <= next_row < self.height and 0 <= next_col < self.width):
+                return
+
+            if next_row * self.width + next_col in self.obstructions:
+                direction = CLOCKWISE[direction]
+            else:
+                row, col = next_row, next_col
+
+    def obstruction_candidates(self) -> list[Candidate]:
+        # Only cells on the original route can change it, and the route up to the
+        # first time the guard reaches one is unaffected by obstructing it
+        candidates: list[Candidate] = []
+        visited = {self.start}
+        previous_state = None
+
+        for state in self.patrol():
+            cell = state[:2]
+            if cell not in visited:
+                visited.add(cell)
+                candidates.append((previous_state, cell))  # type: ignore
+
+            previous_state = state
+
+        return candidates
+
+    def count_loops(self, candidates: tuple[Candidate, ...]) -> int:
+        return sum(
+            self.loops_with_obstruction(state, obstruction)
+            for state, obstruction in candidates
+        )
 
-    @property
-    def offset(self) -> tuple[int, int]:
-        match self:
+    def loops_with_obstruction(
+        self, state: GuardState, obstruction: tuple[int, int]
+    ) -> bool:
+        """
+        Whether the guard, continuing from `state` with an extra obstruction,
+        ends up walking in a loop. Only the cells where the guard stops to turn
+        are recorded, as a bitmask of the directions it was facing there.
+        """
+        row, col, direction = state
+        turns = bytearray(self.width * self.height)
+
+        while True:
+            stop = self._next_stop(row, col, direction, obstruction)
+            if stop is None:
+                return False
+
+            row, col = stop
+            idx = row * self.width + col
+            if turns[idx] & (1 << direction):
+                return True
+
+            turns[idx] |= 1 << direction
+            direction = CLOCKWISE[direction]
+
+    def _next_stop(
+        self,
+        row: int,
+        col: int,
+        direction: Direction,
+        obstruction: tuple[int, int],
+    ) -> tuple[int, int] | None:
+        """Cell in front of the next obstruction, or None if the guard leaves."""
+        extra_row, extra_col = obstruction
+
+        match direction:
             case Direction.NORTH:
-                return (-1, 0)
-            case Direction.EAST:
-                return (0, 1)
+                rows = self.col_obstructions[col]
+                idx = bisect_left(rows, row)
+                blocker = rows[idx - 1] if idx else -1
+                if extra_col == col and blocker < extra_row < row:
+                    blocker = extra_row
+                return (blocker + 1, col) if blocker >= 0 else None
             case Direction.SOUTH:
-                return (1, 0)
+                rows = self.col_obstructions[col]
+                idx = bisect_right(rows, row)
+                blocker = rows[idx] if idx < len(rows) else self.height
+                if extra_col == col and row < extra_row < blocker:
+                    blocker = extra_row
+                return (blocker - 1, col) if blocker < self.height else None
             case Direction.WEST:
-                return (0, -1)
-
-
-@dataclass(frozen=True)
-class Position:
-    row: int
-    col: int
-
-    def with_offset(self, offset: tuple[int, int]) -> Self:
-        return Position(row=self.row + offset[0], col=self.col + offset[1])
-
-
-@dataclass
-class Map:
-    obstructions: set[Position]
-    width: int = 0
-    height: int = 0
-
-    def has_obstruction(self, position: Position) -> bool:
-        return position in self.obstructions
-
-
-@dataclass(frozen=True)
-class Guard:
-    position: Position
-    direction: Direction = Direction.NORTH
-
-    def move(self, map: Map) -> Self:
-        new_position = self.position.with_offset(self.direction.offset)
-        if map.has_obstruction(new_position):
-            return Guard(
-                position=self.position, direction=self.direction.clockwise_direction
-            )
-
-        return Guard(position=new_position, direction=self.direction)
-
-    def in_bounds(self, map: Map) -> bool:
-        return (0 <= self.position.row < map.height) and (
-            0 <= self.position.col < map.width
-        )
+                cols = self.row_obstructions[row]
+                idx = bisect_left(cols, col)
+                blocker = cols[idx - 1] if idx else -1
+                if extra_row == row and blocker < extra_col < col:
+                    blocker = extra_col
+                return (row, blocker + 1) if blocker >= 0 else None
+            case Direction.EAST:
+                cols = self.row_obstructions[row]
+                idx = bisect_right(cols, col)
+                blocker = cols[idx] if idx < len(cols) else self.width
+                if extra_row == row and col < extra_col < blocker:
+                    blocker = extra_col
+                return (row, blocker - 1) if blocker < self.width else None
 
 
-TParsed = tuple[Map, Guard]
+TParsed = LabMap
 
 
 class Solution(SolutionBase[TParsed], year=2024, day=6):
     @classmethod
     def parse_input(cls, infile: TextIO) -> TParsed:
-        map = Map(obstructions=set())
-        guard = None
+        lines = [line.rstrip("\n") for line in infile if line.strip()]
+        width = len(lines[0])
+        start = None
 
-        for row_idx, line in enumerate(infile):
-            for col_idx, char in enumerate(line):
-                position = Position(row=row_idx, col=col_idx)
+        obstructions: set[int] = set()
+        row_obstructions: list[list[int]] = [[] for _ in lines]
+        col_obstructions: list[list[int]] = [[] for _ in range(width)]
+
+        # Scanning in row-major order keeps both sets of lists sorted
+        for row, line in enumerate(lines):
+            for col, char in enumerate(line):
                 match char:
                     case "#":
-                        map.obstructions.add(position)
+                        obstructions.add(row * width + col)
+                        row_obstructions[row].append(col)
+                        col_obstructions[col].append(row)
                     case "^":
-                        guard = Guard(position=position)
+                        start = (row, col)
                     case _:
                         pass
 
-        map.width = col_idx + 1  # type: ignore
-        map.height = row_idx + 1  # type: ignore
-
-        assert guard is not None, "Guard not found in input map."
-        return map, guard
+        assert start is not None, "Guard not found in input map."
+        return LabMap(
+            width=width,
+            height=len(lines),
+            start=start,
+            obstructions=obstructions,
+            row_obstructions=row_obstructions,
+            col_obstructions=col_obstructions,
+        )
 
     @classmethod
     def part_01(cls, parsed_input: TParsed) -> int:
-        map, guard = parsed_input
-        positions: set[Position] = set()
-
-        while guard.in_bounds(map):
-            positions.add(guard.position)
-            guard = guard.move(map)
-
-        return len(positions)
+        return len({(row, col) for row, col, _ in parsed_input.patrol()})
 
     @classmethod
     def part_02(cls, parsed_input: TParsed) -> int:
-        # TODO(@kvchen): eh just brute force it for now
-
-        map, guard = parsed_input
-        total = 0
-
-        for o_row in range(map.height):
-            for o_col in range(map.width):
-                obstruction_position = Position(row=o_row, col=o_col)
-                if guard.position == obstruction_position:
-                    continue
-
-                map_with_obstruction = deepcopy(map)
-                map_with_obstruction.obstructions.add(obstruction_position)
-
-                test_guard = deepcopy(guard)
-                previous_states: set[Guard] = set()
-
-                caused_loop = False
-                while test_guard.in_bounds(map_with_obstruction):
-                    if test_guard in previous_states:
-                        caused_loop = True
-                        break
-
-                    previous_states.add(test_guard)
-                    test_guard = test_guard.move(map_with_obstruction)
-
-                if caused_loop:
-                    total += 1
-
-        return total
+        # Candidates are independent, so they're checked in forked workers that
+        # share the map
+        return sum(
+            fork_map_batched(
+                LabMap.count_loops,
+                parsed_input,
+                parsed_input.obstruction_candidates(),
+                min_batch_size=512,
+            )
+        )
@@ -1,36 +1,70 @@
-from dataclasses import dataclass
-from typing import Callable, TextIO
-from operator import add, mul
+from dataclasses import dataclass, field
+from functools import partial
+from typing import TextIO
 
+from common.parallel import fork_map_batched
 from common.solution import SolutionBase
 
 
-def concat(x: int, y: int) -> int:
-    return int(str(x) + str(y))
-
-
-Operation = Callable[[int, int], int]
-
-
 @dataclass
 class Calibration:
     test_value: int
     values: list[int]
+    # Power of ten each value's left operand is scaled by when concatenating
+    concat_scales: list[int] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        self.concat_scales = []
+        for value in self.values:
+            scale = 10
+            while scale <= value:
+                scale *= 10
+            self.concat_scales.append(scale)
+
+    def can_match(self, *, allow_concat: bool = False) -> bool:
+        """
+        Works back from the test value, undoing the last operation at each step:
+        add by subtracting, mul only when the value divides the target and concat
+        only when the target ends in the value's digits. Since values only grow
+        the total, a target smaller than the value left to undo is a dead end.
+        """
+        values = self.values
+        stack = [(len(values) - 1, self.test_value)]
+
+        while stack:
+            idx, target = stack.pop()
+            value = values[idx]
+            if idx == 0:
+                if target == value:
+                    return True
+                continue
+
+            if target >= value:
+                stack.append((idx - 1, target - value))
+            if value and target % value == 0:
+                stack.append((idx - 1, target // value))
+            elif not value and not target:
+                # Multiplying by zero matches whatever came before
+                return True
+            if allow_concat:
+                scale = self.concat_scales[idx]
+                if target % scale == value:
+                    stack.append((idx - 1, target // scale))
+
+        return False
 
-    def can_match(self, ops: list[Operation]) -> bool:
-        return self._can_match_impl(ops, self.values[0], value_idx=1)
-
-    def _can_match_impl(self, ops: list[Operation], total: int, value_idx: int) -> bool:
-        if value_idx == len(self.values):
-            return total == self.test_value
 
-        value = self.values[value_idx]
-        return any(
-            self._can_match_impl(ops, op(total, value), value_idx + 1) for op in ops
-        )
+TParsed = list[Calibration]
 
 
-TParsed = list[Calibration]
+def batch_matching_total(
+    calibrations: TParsed, indices: tuple[int, ...], *, allow_concat: bool
+) -> int:
+    return sum(
+        calibrations[idx].test_value
+        for idx in indices
+        if calibrations[idx].can_match(allow_concat=allow_concat)
+    )
 
 
 class Solution(SolutionBase[TParsed], year=2024, day=7):
@@ -49,16 +83,21 @@ class Solution(SolutionBase[TParsed], year=2024, day=7):
 
     @classmethod
     def part_01(cls, parsed_input: TParsed) -> int:
-        total = 0
-        for calibration in parsed_input:
-            if calibration.can_match([add, mul]):
-                total += calibration.test_value
-        return total
+        return cls.matching_total(parsed_input, allow_concat=False)
 
     @classmethod
     def part_02(cls, parsed_input: TParsed) -> int:
-        total = 0
-        for calibration in parsed_input:
-            if calibration.can_match([add, mul, concat]):
-                total += calibration.test_value
-        return total
+        return cls.matching_total(parsed_input, allow_concat=True)
+
+    @classmethod
+    def matching_total(cls, parsed_input: TParsed, allow_concat: bool) -> int:
+        # Calibrations are shared with the forked workers, which are only sent
+        # the indexes of their batch
+        return sum(
+            fork_map_batched(
+                partial(batch_matching_total, allow_concat=allow_concat),
+                parsed_input,
+                range(len(parsed_input)),
+                min_batch_size=2000,
+            )
+        )
@@ -1,99 +1,116 @@
-from copy import deepcopy
 from dataclasses import dataclass
+from heapq import heappop, heappush
 from typing import TextIO
 
 from common.solution import SolutionBase
 
-
-@dataclass
-class Chunk:
-    file_id: int
-    length: int
-
-    def __str__(self) -> str:
-        # return f"[{self.file_id}:{self.length}]"
-        return ("[.]" if self.is_free_space else f"[{self.file_id}]") * self.length
-
-    @property
-    def is_free_space(self) -> bool:
-        return self.file_id == -1
+# Maps ASCII digits to their values
+DIGIT_VALUES = bytes.maketrans(b"0123456789", bytes(range(10)))
+WHITESPACE = b" \t\r\n"
 
 
 @dataclass
 class DiskMap:
-    chunks: list[Chunk]
-
-    def __str__(self) -> str:
-        return "".join(str(chunk) for chunk in self.chunks)
-
-    def compress_blocks(self) -> "DiskMap":
-        compressed_map = deepcopy(self)
-
-        idx = 0
-        while idx < len(compressed_map.chunks):
-            chunk = compressed_map.chunks[idx]
-            if chunk.is_free_space:
-                while (last_chunk := compressed_map.chunks.pop()).is_free_space:
-                    pass
+    """
+    Chunk lengths in disk order, one byte per chunk. Even chunks are files, with
+    the file id being half the chunk index, and odd chunks are free space.
+    """
+
+    lengths: bytes
+
+    def compressed_blocks_checksum(self) -> int:
+        """
+        Checksum after moving file blocks one at a time from the end of the disk
+        into the leftmost free block. Walks the chunks from both ends at once,
+        filling each free chunk from the rightmost file with blocks left.
+        """
+        lengths = self.lengths
+        total = 0
+        offset = 0
 
-                remaining_chunk = compressed_map._move_chunk(idx, last_chunk)
-                if remaining_chunk:
-                    compressed_map.chunks.append(remaining_chunk)
+        left = 0
+        right = len(lengths) - 1 if len(lengths) % 2 else len(lengths) - 2
+        right_remaining = lengths[right] if right >= 0 else 0
+
+        while left < right:
+            if not left % 2:
+                length = lengths[left]
+                total += (left // 2) * _offset_sum(offset, length)
+                offset += length
+                left += 1
+                continue
+
+            free = lengths[left]
+            while free and left < right:
+                moved = min(free, right_remaining)
+                total += (right // 2) * _offset_sum(offset, moved)
+                offset += moved
+                free -= moved
+                right_remaining -= moved
+
+                if not right_remaining:
+                    right -= 2
+                    right_remaining = lengths[right] if right > left else 0
+            left += 1
+
+        # Whatever is left of a partially moved file stays where it is
+        if left == right:
+            total += (right // 2) * _offset_sum(offset, right_remaining)
 
-            idx += 1
+        return total
 
-        return compressed_map
+    def compressed_files_checksum(self) -> int:
+        """
+        Checksum after moving each whole file, highest id first, into the leftmost
+        free span that fits it. Free spans are kept in one min-heap of start
+        offsets per span length, so finding that span means comparing the tops of
+        at most ten heaps, and files are never actually moved.
+        """
+        # Chunk lengths are single digits
+        free_spans: list[list[int]] = [[] for _ in range(10)]
+        files: list[tuple[int, int, int]] = []
 
-    def compress_files(self) -> "DiskMap":
-        compressed_map = deepcopy(self)
+        offset = 0
+        for idx, length in enumerate(self.lengths):
+            if idx % 2:
+                if length:
+                    # Offsets only grow, so appending keeps each list a heap
+                    free_spans[length].append(offset)
+            elif length:
+                files.append((idx // 2, offset, length))
+            offset += length
 
-        idx = len(compressed_map.chunks) - 1
-        while idx > 0:
-            chunk = compressed_map.chunks[idx]
-            if not chunk.is_free_space:
-                space_idx = compressed_map._find_free_space(
-                    chunk.length, before_idx=idx
-                )
-                if space_idx >= 0:
-                    compressed_map.chunks[idx] = Chunk(-1, chunk.length)
-                    remaining_chunk = compressed_map._move_chunk(space_idx, chunk)
-                    assert not remaining_chunk
-                    idx += 1
-            idx -= 1
+        total = 0
+        for file_id, start, length in reversed(files):
+            span_length = 0
+            for candidate_length in range(length, 10):
+                spans = free_spans[candidate_length]
+                if spans and spans[0] < start:
+                    start = spans[0]
+                    span_length = candidate_length
 
-        return compressed_map
+            if span_length:
+                heappop(free_spans[span_length])
+                if span_length > length:
+                    heappush(free_spans[span_length - length], start + length)
 
-    def checksum(self) -> int:
-        total = 0
-        offset = 0
+            total += file_id * _offset_sum(start, length)
 
-        for chunk in self.chunks:
-            if not chunk.is_free_space:
-                for idx in range(chunk.length):
-                    total += chunk.file_id * (offset + idx)
-            offset += chunk.length
         return total
 
-    def _find_free_space(self, length: int, before_idx: int) -> int:
-        for idx in range(before_idx):
-            chunk = self.chunks[idx]
-            if chunk.is_free_space and chunk.length >= length:
-                return idx
-        return -1
 
-    def _move_chunk(self, space_idx: int, chunk: Chunk) -> Chunk | None:
-        space_chunk = self.chunks.pop(space_idx)
+def _offset_sum(start: int, length: int) -> int:
+    """Sum of the offsets `start, start + 1, ..., start + length - 1`."""
+    return length * start + length * (length - 1) // 2
+
 
-        if space_chunk.length == chunk.length:
-            self.chunks.insert(space_idx, chunk)
-        elif space_chunk.length > chunk.length:
-            self.chunks.insert(space_idx, chunk)
-            self.chunks.insert(
-                space_idx + 1, Chunk(-1, space_chunk.length - chunk.length)
-            )
-        elif space_chunk.length < chunk.length:
-            self.chunks.insert(space_idx, Chunk(chunk.file_id, space_chunk.length))
-            return Chunk(chunk.file_id, chunk.length - space_chunk.length)
+def _read_bytes(infile: TextIO) -> bytes:
+    # Real files are read from their binary buffer, so large inputs aren't
+    # decoded as text first
+    buffer = getattr(infile, "buffer", None)
+    if buffer is not None:
+        return buffer.read()
+    return infile.read().encode()
 
 
 TParsed = DiskMap
@@ -102,28 +119,14 @@ TParsed = DiskMap
 class Solution(SolutionBase[TParsed], year=2024, day=9):
     @classmethod
     def parse_input(cls, infile: TextIO) -> TParsed:
-        chunks: list[Chunk] = []
-
-        file_id = 0
-        is_free_space = False
-
-        for char in infile.read().strip():
-            chunk_length = int(char)
-            if is_free_space:
-                chunk = Chunk(-1, chunk_length)
-            else:
-                chunk = Chunk(file_id, chunk_length)
-                file_id += 1
-
-            chunks.append(chunk)
-            is_free_space = not is_free_space
-
-        return DiskMap(chunks)
+        # Dropping whitespace in the same pass avoids another copy of the input
+        lengths = _read_bytes(infile).translate(DIGIT_VALUES, WHITESPACE)
+        return DiskMap(lengths=lengths)
 
     @classmethod
     def part_01(cls, parsed_input: TParsed) -> int:
-        return parsed_input.compress_blocks().checksum()
+        return parsed_input.compressed_blocks_checksum()
 
     @classmethod
     def part_02(cls, parsed_input: TParsed) -> int:
-        return parsed_input.compress_files().checksum()
+        return parsed_input.compressed_files_checksum()
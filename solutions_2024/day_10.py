@@ -1,37 +1,59 @@
 from dataclasses import dataclass
-from typing import Iterator, TextIO
+from typing import TextIO
 
-from common.direction import Direction
 from common.grid import GridBase
 from common.solution import SolutionBase
-from common.position import Position
 
 
 @dataclass
 class TopographicMap(GridBase[int]):
     @property
-    def trailheads(self) -> Iterator[Position]:
-        for position, value in iter(self):
-            if value == 0:
-                yield position
-
-    def reachable_paths(self, position: Position) -> list[list[Position]]:
-        height = self[position]
-        if height == 9:
-            return [[position]]
-
-        paths: list[list[Position]] = []
-        for direction in Direction:
-            next_position = position.with_offset(direction.offset)
-            if next_position not in self:
+    def trailheads(self) -> list[int]:
+        return self.where(0)
+
+    def reachable_peaks(self, idx: int) -> set[int]:
+        peaks: set[int] = set()
+        visited: set[int] = {idx}
+        frontier: list[int] = [idx]
+
+        heights = self.cells
+        neighbors = self.neighbors_4
+
+        while frontier:
+            current_idx = frontier.pop()
+            height = heights[current_idx]
+            if height == 9:
+                peaks.add(current_idx)
                 continue
 
-            if self[next_position] == (height + 1):
-                paths.extend(
-                    [position] + path for path in self.reachable_paths(next_position)
+            for k in range(current_idx * 4, current_idx * 4 + 4):
+                next_idx = neighbors[k]
+                if (
+                    next_idx >= 0
+                    and heights[next_idx] == height + 1
+                    and next_idx not in visited
+                ):
+                    visited.add(next_idx)
+                    frontier.append(next_idx)
+
+        return peaks
+
+    def ratings(self) -> list[int]:
+        """Number of distinct hiking trails from each cell up to a peak."""
+        heights = self.cells
+        neighbors = self.neighbors_4
+        ratings = [1 if height == 9 else 0 for height in heights]
+
+        # Fill in from the top down so every uphill neighbor is already rated
+        for height in range(8, -1, -1):
+            for idx in self.where(height):
+                ratings[idx] = sum(
+                    ratings[next_idx]
+                    for next_idx in neighbors[idx * 4 : idx * 4 + 4]
+                    if next_idx >= 0 and heights[next_idx] == height + 1
                 )
 
-        return paths
+        return ratings
 
 
 TParsed = TopographicMap
@@ -50,16 +72,11 @@ class Solution(SolutionBase[TParsed], year=2024, day=10):
     @classmethod
     def part_01(cls, parsed_input: TParsed) -> int:
         total = 0
-        for trailhead_position in parsed_input.trailheads:
-            peaks: set[Position] = set()
-            for path in parsed_input.reachable_paths(trailhead_position):
-                peaks.add(path[-1])
-            total += len(peaks)
+        for trailhead_idx in parsed_input.trailheads:
+            total += len(parsed_input.reachable_peaks(trailhead_idx))
         return total
 
     @classmethod
     def part_02(cls, parsed_input: TParsed) -> int:
-        total = 0
-        for trailhead_position in parsed_input.trailheads:
-            total += len(parsed_input.reachable_paths(trailhead_position))
-        return total
+        ratings = parsed_input.ratings()
+        return sum(ratings[trailhead_idx] for trailhead_idx in parsed_input.trailheads)
@@ -1,52 +1,203 @@
+from bisect import bisect_right
 from collections import Counter
-from dataclasses import dataclass
-from typing import Self, TextIO
+from dataclasses import dataclass, field
+from itertools import islice
+import os
+from pathlib import Path
+import pickle
+from typing import ClassVar, Iterable, Self, TextIO
 
+from common.cache import solution_source_digest, state_dir
 from common.solution import SolutionBase
 
+POWERS_OF_TEN = [10**exponent for exponent in range(64)]
+
+# Besides the requested blink counts, the memo keeps every layer that's a
+# multiple of this, so longer runs can resume from the nearest one below
+CHECKPOINT_INTERVAL = 100
+
+
+def split_stone(value: int) -> tuple[int, ...]:
+    if value == 0:
+        return (1,)
+
+    num_digits = bisect_right(POWERS_OF_TEN, value)
+    if num_digits % 2 == 0:
+        return divmod(value, POWERS_OF_TEN[num_digits // 2])
+
+    return (value * 2024,)
+
 
 @dataclass
-class StoneLine:
-    value_counts: Counter[int]
+class StoneMemo:
+    """
+    Number of stones a single stone turns into after some number of blinks,
+    memoized by (value, blinks). Counts are computed a layer of blinks at a
+    time over every value reachable from the starting stones, and only
+    checkpoint layers are stored, so neither recursion depth nor memory grows
+    with the number of blinks. The oldest counts and children are evicted past
+    `max_entries`.
+    """
 
-    def blink(self) -> Self:
-        next_counts: Counter[int] = Counter()
-        for value, count in self.value_counts.items():
-            if value == 0:
-                next_counts[1] += count
-                continue
+    max_entries: int = 250_000
+    counts: dict[tuple[int, int], int] = field(default_factory=dict)
+    children: dict[int, tuple[int, ...]] = field(default_factory=dict)
+    layers: set[int] = field(default_factory=lambda: {0})
+
+    @classmethod
+    def load(cls, path: Path) -> Self:
+        try:
+            with open(path, "rb") as f:
+                memo = pickle.load(f)
+        except Exception:
+            # Missing or stale memos, e.g. pickled classes that have since changed
+            return cls()
+
+        return memo if isinstance(memo, cls) else cls()
+
+    def save(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_path, "wb") as f:
+            pickle.dump(self, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+
+    def num_stones(self, value: int, blinks: int) -> int:
+        return self.num_stones_by_value([value], blinks)[value]
+
+    def num_stones_by_value(self, values: Iterable[int], blinks: int) -> dict[int, int]:
+        values = set(values)
+        if all((value, blinks) in self.counts for value in values):
+            return {value: self.counts[value, blinks] for value in values}
+
+        # Blinks each reachable value still needs, given how soon it's reached
+        remaining = self._reachable(values, blinks)
+        by_remaining = sorted(remaining, key=remaining.__getitem__, reverse=True)
+
+        start = self._resume_layer(remaining, blinks)
+        layer = {
+            value: self.counts.get((value, start), 1)
+            for value in by_remaining
+            if remaining[value] >= start
+        }
+
+        for blink in range(start + 1, blinks + 1):
+            next_layer: dict[int, int] = {}
+            for value in by_remaining:
+                if remaining[value] < blink:
+                    break
+                next_layer[value] = sum(layer[child] for child in self.children[value])
+            layer = next_layer
+
+            if blink % CHECKPOINT_INTERVAL == 0 or blink == blinks:
+                self._store(layer, blink)
+
+        # Children are only dropped between computations, which need all of theirs
+        _evict_oldest(self.children, self.max_entries)
+        return {value: layer[value] for value in values}
 
-            value_str = str(value)
-            if len(value_str) % 2 == 0:
-                midpoint_idx = len(value_str) // 2
-                next_counts[int(value_str[:midpoint_idx])] += count
-                next_counts[int(value_str[midpoint_idx:])] += count
+    def _reachable(self, values: set[int], blinks: int) -> dict[int, int]:
+        remaining = dict.fromkeys(values, blinks)
+        frontier = list(values)
+
+        for blink in range(blinks - 1, -1, -1):
+            next_frontier: list[int] = []
+            for value in frontier:
+                children = self.children.get(value)
+                if children is None:
+                    children = self.children[value] = split_stone(value)
+
+                for child in children:
+                    if child not in remaining:
+                        remaining[child] = blink
+                        next_frontier.append(child)
+            frontier = next_frontier
+
+        return remaining
+
+    def _resume_layer(self, remaining: dict[int, int], blinks: int) -> int:
+        # The highest stored layer that has a count for every value needing it
+        for layer in sorted(self.layers, reverse=True):
+            if layer > blinks:
                 continue
+            if all(
+                (value, layer) in self.counts
+                for value, value_remaining in remaining.items()
+                if value_remaining >= layer
+            ):
+                return layer
+
+        return 0
 
-            next_counts[value * 2024] += count
+    def _store(self, layer: dict[int, int], blinks: int) -> None:
+        for value, count in layer.items():
+            self.counts[value, blinks] = count
+        self.layers.add(blinks)
+        _evict_oldest(self.counts, self.max_entries)
 
-        return StoneLine(next_counts)
 
-    def num_stones(self) -> int:
-        return self.value_counts.total()
+def _evict_oldest(entries: dict, max_entries: int) -> None:
+    # Dicts keep insertion order, so this drops the oldest entries
+    excess = len(entries) - max_entries
+    if excess > 0:
+        for key in list(islice(entries, excess)):
+            del entries[key]
+
+
+@dataclass
+class StoneLine:
+    value_counts: Counter[int]
+
+    def num_stones(self, blinks: int, memo: StoneMemo) -> int:
+        stones_by_value = memo.num_stones_by_value(self.value_counts, blinks)
+        return sum(
+            count * stones_by_value[value] for value, count in self.value_counts.items()
+        )
 
 
 TParsed = StoneLine
 
 
 class Solution(SolutionBase[TParsed], year=2024, day=11):
+    # Memos persisted in the state directory, shared by every input solved in
+    # this process
+    memos: ClassVar[dict[Path, StoneMemo]] = {}
+
     @classmethod
     def parse_input(cls, infile: TextIO) -> TParsed:
         return StoneLine(Counter(int(x) for x in infile.read().strip().split()))
 
     @classmethod
     def part_01(cls, parsed_input: TParsed) -> int:
-        for _ in range(25):
-            parsed_input = parsed_input.blink()
-        return parsed_input.num_stones()
+        return cls.num_stones(parsed_input, 25)
 
     @classmethod
     def part_02(cls, parsed_input: TParsed) -> int:
-        for _ in range(75):
-            parsed_input = parsed_input.blink()
-        return parsed_input.num_stones()
+        return cls.num_stones(parsed_input, 75)
+
+    @classmethod
+    def memo_path(cls) -> Path | None:
+        directory = state_dir()
+        if directory is None:
+            return None
+
+        # Counts from another version of the solution may be wrong for this one
+        return (
+            directory / f"day_11_stone_memo_{solution_source_digest(__name__)}.pickle"
+        )
+
+    @classmethod
+    def num_stones(cls, parsed_input: TParsed, blinks: int) -> int:
+        memo_path = cls.memo_path()
+        if memo_path is None:
+            # Without a state directory every solve starts from scratch, so
+            # repeated runs (e.g. benchmarks) measure the actual work
+            return parsed_input.num_stones(blinks, StoneMemo())
+
+        memo = cls.memos.get(memo_path)
+        if memo is None:
+            memo = cls.memos[memo_path] = StoneMemo.load(memo_path)
+
+        num_stones = parsed_input.num_stones(blinks, memo)
+        memo.save(memo_path)
+        return num_stones
@@ -3,83 +3,79 @@ import re
 
 from dataclasses import dataclass
 from typing import TextIO
-from itertools import islice
 
 from common.solution import SolutionBase
 
-np.set_printoptions(suppress=True, precision=100)
+# Largest magnitude int64 arithmetic may reach before falling back to Python ints
+INT64_LIMIT = 2**62
 
 
 @dataclass
-class ClawMachine:
+class ClawMachines:
+    """
+    Every machine's button A and B moves and prize location, as (M, 2) arrays of
+    (x, y) integers.
+    """
+
     a: np.ndarray
     b: np.ndarray
     prize: np.ndarray
 
-    def cheapest_cost(self) -> int:
-        if (solution := self._solve()) is None:
-            return 0
-
-        return int(solution @ np.array([3, 1]))
+    def cheapest_cost(self, prize_offset: int = 0) -> int:
+        """
+        Total tokens to win every winnable prize. Each machine's system of two
+        equations is solved with Cramer's rule, keeping the determinant out of
+        the numerators so everything stays exact integer arithmetic.
+        """
+        a, b, prize = self.a, self.b, self.prize
 
-    def _solve(self) -> np.ndarray | None:
-        a = self.a[0]
-        b = self.b[0]
-        c = self.a[1]
-        d = self.b[1]
+        # Products of a move and a prize coordinate must fit in int64, otherwise
+        # fall back to (much slower) Python ints
+        max_move = int(np.abs(np.concatenate((a, b))).max(initial=0))
+        max_prize = int(np.abs(prize).max(initial=0)) + abs(prize_offset)
+        if 2 * max_move * max(max_move, max_prize) >= INT64_LIMIT:
+            a, b, prize = a.astype(object), b.astype(object), prize.astype(object)
+        prize = prize + prize_offset
 
-        adj_matrix = np.array([[d, -b], [-c, a]])
-        det = a * d - b * c
+        det = a[:, 0] * b[:, 1] - b[:, 0] * a[:, 1]
+        a_presses_det = b[:, 1] * prize[:, 0] - b[:, 0] * prize[:, 1]
+        b_presses_det = a[:, 0] * prize[:, 1] - a[:, 1] * prize[:, 0]
 
-        A_inv_b_det = adj_matrix @ self.prize
+        # Machines whose buttons move in the same direction have no single
+        # solution, and are treated as unwinnable
+        solvable = det != 0
+        det = np.where(solvable, det, 1)
+        solvable &= (a_presses_det % det == 0) & (b_presses_det % det == 0)
 
-        # Divide out the determinant later on to avoid precision issues
+        # Buttons can't be pressed a negative number of times
+        a_presses, b_presses = a_presses_det // det, b_presses_det // det
+        solvable &= (a_presses >= 0) & (b_presses >= 0)
 
-        if np.any(A_inv_b_det % det):  # type: ignore
-            return None
+        costs = 3 * a_presses + b_presses
+        return int(np.where(solvable, costs, 0).sum())
 
-        return (A_inv_b_det / det).round()
 
-
-TParsed = list[ClawMachine]
+TParsed = ClawMachines
 
 
 class Solution(SolutionBase[TParsed], year=2024, day=13):
     @classmethod
     def parse_input(cls, infile: TextIO) -> TParsed:
-        parsed: TParsed = []
-
-        it = iter(infile)
-        while chunk := tuple(islice(it, 4)):
-            button_a_match = re.match(
-                r"^Button A: X\+(\d+), Y\+(\d+)$", chunk[0].strip()
-            )
-            button_b_match = re.match(
-                r"^Button B: X\+(\d+), Y\+(\d+)$", chunk[1].strip()
-            )
-            prize_match = re.match(r"^Prize: X=(\d+), Y=(\d+)$", chunk[2].strip())
-
-            assert button_a_match
-            assert button_b_match
-            assert prize_match
-
-            cm = ClawMachine(
-                a=np.array([int(x) for x in button_a_match.groups()]),
-                b=np.array([int(x) for x in button_b_match.groups()]),
-                prize=np.array([int(x) for x in prize_match.groups()]),
-            )
-            parsed.append(cm)
-
-        return parsed
+        # Each machine is a block of three lines with two numbers each: button A's
+        # move, button B's move and the prize location
+        numbers = re.findall(r"\d+", infile.read())
+        try:
+            machines = np.array(numbers, dtype=np.int64).reshape(-1, 3, 2)
+        except OverflowError:
+            machines = np.array([int(x) for x in numbers], dtype=object)
+            machines = machines.reshape(-1, 3, 2)
+
+        return ClawMachines(a=machines[:, 0], b=machines[:, 1], prize=machines[:, 2])
 
     @classmethod
     def part_01(cls, parsed_input: TParsed) -> int:
-        return sum(cm.cheapest_cost() for cm in parsed_input)
+        return parsed_input.cheapest_cost()
 
     @classmethod
     def part_02(cls, parsed_input: TParsed) -> int:
-        offset = 10000000000000
-        adjusted_cms = [
-            ClawMachine(cm.a, cm.b, cm.prize + offset) for cm in parsed_input
-        ]
-        return sum(cm.cheapest_cost() for cm in adjusted_cms)
+        return parsed_input.cheapest_cost(prize_offset=10000000000000)
@@ -1,62 +1,59 @@
-from math import prod
+from math import lcm, prod
 import re
+import sys
 import numpy as np
 
-from collections import Counter
 from dataclasses import dataclass
 from typing import Self, TextIO
 
 from common.solution import SolutionBase
 
 
-@dataclass
-class Robot:
-    position: np.ndarray
-    velocity: np.ndarray
-
-    def simulate(self, steps: int) -> Self:
-        return Robot(self.position + self.velocity * steps, self.velocity)
-
-
 @dataclass
 class Bathroom:
+    """
+    Robots are stored as (N, 2) arrays of (x, y) positions and velocities.
+    Velocities are kept modulo the room size, which moves robots the same way
+    but keeps every intermediate value small enough for int32.
+    """
+
     size: np.ndarray
-    robots: list[Robot]
+    positions: np.ndarray
+    velocities: np.ndarray
 
     def __str__(self) -> str:
-        grid = np.zeros(self.size)
-        for robot in self.robots:
-            grid[*robot.position] += 1
-
         out = ""
-        for row in grid.T:
+        for row in self.to_grid().T:
             out += "".join("." if col == 0 else str(int(col)) for col in row) + "\n"
 
         return out
 
     def simulate(self, steps: int) -> Self:
-        robots = [robot.simulate(steps) for robot in self.robots]
-        for robot in robots:
-            robot.position = robot.position % self.size
-        return Bathroom(self.size, robots)
+        steps_per_axis = np.array([steps % int(dim) for dim in self.size], np.int32)
+        positions = self.velocities * steps_per_axis
+        positions += self.positions
+        positions %= self.size
+        return Bathroom(self.size, positions, self.velocities)
 
     def to_grid(self) -> np.ndarray:
-        grid = np.zeros(self.size)
-        for robot in self.robots:
-            grid[*robot.position] += 1
-        return grid
+        return self.robot_counts().reshape(self.size)
+
+    def robot_counts(self) -> np.ndarray:
+        """Robots per cell, flattened as `x * height + y`."""
+        cells = self.positions[:, 0] * self.size[1] + self.positions[:, 1]
+        return np.bincount(cells, minlength=int(prod(self.size)))
 
     def safest_area(self) -> int:
-        counts: Counter[tuple[bool, bool]] = Counter()
         midpoint = self.size // 2
 
-        for robot in self.robots:
-            if np.any(robot.position == midpoint):  # type: ignore
-                continue
-
-            counts[tuple(robot.position < midpoint)] += 1  # type: ignore
+        # 0, 1 or 2 along each axis for before, on or past the midline
+        sides = (self.positions > midpoint).astype(np.int32)
+        sides += self.positions >= midpoint
+        counts = np.bincount(sides[:, 0] * 3 + sides[:, 1], minlength=9)
 
-        return prod(counts.values())
+        # Robots on either midline don't count towards any quadrant
+        quadrant_counts = counts[[0, 2, 6, 8]]
+        return prod(int(count) for count in quadrant_counts if count)
 
 
 TParsed = Bathroom
@@ -65,21 +62,13 @@ TParsed = Bathroom
 class Solution(SolutionBase[TParsed], year=2024, day=14):
     @classmethod
     def parse_input(cls, infile: TextIO) -> TParsed:
-        robots: list[Robot] = []
-
-        for line in infile:
-            match = re.match(r"^p=(.*),(.*) v=(.*),(.*)$", line.strip())
-            assert match
+        # Each robot is a line of the form "p=x,y v=dx,dy"
+        values = np.array(re.findall(r"-?\d+", infile.read()), dtype=np.int32)
+        robots = values.reshape(-1, 4)
 
-            groups = match.groups()
-            position = np.array([int(groups[0]), int(groups[1])])
-            velocity = np.array([int(groups[2]), int(groups[3])])
-
-            robots.append(Robot(position, velocity))
-
-        # size = np.array([11, 7])
-        size = np.array([101, 103])
-        return Bathroom(size, robots)
+        # size = np.array([11, 7], dtype=np.int32)
+        size = np.array([101, 103], dtype=np.int32)
+        return Bathroom(size, robots[:, :2] % size, robots[:, 2:] % size)
 
     @classmethod
     def part_01(cls, parsed_input: TParsed) -> int:
@@ -88,10 +77,13 @@ class Solution(SolutionBase[TParsed], year=2024, day=14):
 
     @classmethod
     def part_02(cls, parsed_input: TParsed) -> int:
-        i = 0
-        while True:
-            i += 1
+        # Positions repeat once every axis has gone through a full period
+        period = lcm(*map(int, parsed_input.size))
+        for i in range(1, period + 1):
             simulated = parsed_input.simulate(steps=i)
-            if not np.any(simulated.to_grid() > 1):  # type: ignore
-                print(simulated)
+            if simulated.robot_counts().max() <= 1:
+                # Shown on stderr so it stays out of answers and timing tables
+                print(simulated, file=sys.stderr)
                 return i
+
+        raise ValueError(f"No step without overlapping robots in {period} steps")
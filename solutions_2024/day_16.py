@@ -1,93 +1,110 @@
-from collections import deque
 from dataclasses import dataclass
-from typing import Iterator, Literal, TextIO
-
-import networkx as nx
-import numpy as np
+from functools import cached_property
+from heapq import heappop, heappush
+from typing import Iterable, TextIO
 
 from common.direction import Direction
 from common.grid import GridBase
-from common.position import Position
 from common.solution import SolutionBase
 
-
-@dataclass
-class Reindeer:
-    position: np.ndarray
-    direction: Direction = Direction.EAST
+MOVE_COST = 1
+TURN_COST = 1000
+UNREACHABLE = float("inf")
 
 
 @dataclass
-class Map:
-    graph: nx.DiGraph
-    start: Position
-    end: Position
-
-    def shortest_path_length(self) -> int:
-        return nx.shortest_path_length(
-            self.graph, (self.start, Direction.EAST), "END", weight="weight"
+class Maze(GridBase[str]):
+    """
+    Search states are `cell * 4 + direction`, which also makes them indexes into
+    the grid's 4-neighbor table, since its offsets are in `Direction` order.
+    """
+
+    @cached_property
+    def start(self) -> int:
+        return self.where("S")[0]
+
+    @cached_property
+    def end(self) -> int:
+        return self.where("E")[0]
+
+    def costs_from_start(self) -> list[float]:
+        return self._dijkstra([self.start * 4 + Direction.EAST], reverse=False)
+
+    def best_cost(self, costs_from_start: list[float]) -> int:
+        best = min(costs_from_start[self.end * 4 : self.end * 4 + 4])
+        if best == UNREACHABLE:
+            raise ValueError("No path from the start to the end")
+        return int(best)
+
+    def costs_to_end(self) -> list[float]:
+        # Facing doesn't matter once at the end
+        return self._dijkstra(
+            [self.end * 4 + direction for direction in Direction], reverse=True
         )
 
-    def all_shortest_paths(
-        self,
-    ) -> Iterator[list[tuple[Position, Direction]]]:
-        for path in nx.all_shortest_paths(
-            self.graph, (self.start, Direction.EAST), "END", weight="weight"
-        ):
-            yield path[:-1]  # type: ignore
-
-
-TParsed = Map
-
-
-class Solution(SolutionBase[TParsed], year=2024, day=16):
-    @classmethod
-    def parse_input(cls, infile: TextIO) -> TParsed:
-        raw_grid = np.array([[c for c in row.strip()] for row in infile])
+    def _dijkstra(self, sources: Iterable[int], reverse: bool) -> list[float]:
+        """
+        Lowest cost of every state from any of `sources`. With `reverse`, edges
+        are followed backwards, giving the lowest cost from every state to a
+        source instead.
+        """
+        cells = self.cells
+        neighbors = self.neighbors_4
+        # Walking backwards means stepping away from the facing direction
+        step_offset = 2 if reverse else 0
 
-        spaces = np.transpose(np.where(raw_grid != "#"))
-        start_pos = Position.from_ndarray(np.transpose(np.where(raw_grid == "S"))[0])
-        end_pos = Position.from_ndarray(np.transpose(np.where(raw_grid == "E"))[0])
+        costs: list[float] = [UNREACHABLE] * (len(cells) * 4)
+        frontier: list[tuple[int, int]] = []
+        for source in sources:
+            costs[source] = 0
+            frontier.append((0, source))
 
-        graph = nx.DiGraph()
+        while frontier:
+            cost, state = heappop(frontier)
+            if cost > costs[state]:
+                continue
 
-        # Pass 1: Populate nodes
+            cell, direction = divmod(state, 4)
+            next_cell = neighbors[cell * 4 + (direction + step_offset) % 4]
+            if next_cell >= 0 and cells[next_cell] != "#":
+                next_state = next_cell * 4 + direction
+                if cost + MOVE_COST < costs[next_state]:
+                    costs[next_state] = cost + MOVE_COST
+                    heappush(frontier, (cost + MOVE_COST, next_state))
 
-        for space_pos in spaces:
-            for direction in Direction:
-                graph.add_node((Position.from_ndarray(space_pos), direction))
+            for next_direction in ((direction + 1) % 4, (direction + 3) % 4):
+                next_state = cell * 4 + next_direction
+                if cost + TURN_COST < costs[next_state]:
+                    costs[next_state] = cost + TURN_COST
+                    heappush(frontier, (cost + TURN_COST, next_state))
 
-        # Pass 2: Populate edges
+        return costs
 
-        for pos, direction in graph.nodes:
-            offset_pos = pos.with_offset(direction.offset)
-            if (offset_pos, direction) in graph.nodes:
-                graph.add_edge(
-                    (pos, direction),
-                    (offset_pos, direction),
-                    weight=1,
-                )
 
-            for rot_direction in (
-                direction.clockwise_direction,
-                direction.counterclockwise_direction,
-            ):
-                graph.add_edge((pos, direction), (pos, rot_direction), weight=1000)
+TParsed = Maze
 
-        # We don't care what direction we're facing when we reach the end
-        for direction in Direction:
-            graph.add_edge((end_pos, direction), "END", weight=0)
 
-        return Map(graph=graph, start=start_pos, end=end_pos)
+class Solution(SolutionBase[TParsed], year=2024, day=16):
+    @classmethod
+    def parse_input(cls, infile: TextIO) -> TParsed:
+        return Maze([[c for c in row.strip()] for row in infile if row.strip()])
 
     @classmethod
     def part_01(cls, parsed_input: TParsed) -> int:
-        return parsed_input.shortest_path_length()
+        return parsed_input.best_cost(parsed_input.costs_from_start())
 
     @classmethod
     def part_02(cls, parsed_input: TParsed) -> int:
-        seats = set()
-        for path in parsed_input.all_shortest_paths():
-            for pos, _ in path:
-                seats.add(pos)
-        return len(seats)
+        # A state is on some best path exactly when the best cost to reach it
+        # plus the best cost from it to the end adds up to the best total
+        from_start = parsed_input.costs_from_start()
+        to_end = parsed_input.costs_to_end()
+        best = parsed_input.best_cost(from_start)
+
+        return sum(
+            any(
+                from_start[state] + to_end[state] == best
+                for state in range(cell * 4, cell * 4 + 4)
+            )
+            for cell in range(len(parsed_input))
+        )
@@ -1,15 +1,13 @@
-from copy import deepcopy
-from dataclasses import dataclass, field
+from dataclasses import dataclass
+from functools import cache
 from typing import Callable, TextIO
 
 from common.solution import SolutionBase
 
-
-class HaltException(Exception):
-    pass
-
-
 Program = list[int]
+CompiledProgram = Callable[[int, int, int], list[int]]
+
+COMBO_OPERANDS = ("0", "1", "2", "3", "a", "b", "c")
 
 
 @dataclass
@@ -18,102 +16,89 @@ class Computer:
     b: int
     c: int
 
-    inst_ptr: int = 0
-    outputs: list[int] = field(default_factory=list)
-
-    # Instructions
-
-    def adv(self, operand: int) -> int:
-        self.a = self.a // (2 ** self._combo_operand(operand))
-        return 2
-
-    def bxl(self, operand: int) -> int:
-        self.b = self.b ^ self._literal_operand(operand)
-        return 2
-
-    def bst(self, operand: int) -> int:
-        self.b = self._combo_operand(operand) % 8
-        return 2
-
-    def jnz(self, operand: int) -> int:
-        if self.a != 0:
-            result = self._literal_operand(operand)
-            self.inst_ptr = result
-            return 0
-        return 2
-
-    def bxc(self, operand: int) -> int:
-        self.b = self.b ^ self.c
-        return 2
-
-    def out(self, operand: int) -> int:
-        self.outputs.append(self._combo_operand(operand) % 8)
-        return 2
-
-    def bdv(self, operand: int) -> int:
-        self.b = self.a // (2 ** self._combo_operand(operand))
-        return 2
-
-    def cdv(self, operand: int) -> int:
-        self.c = self.a // (2 ** self._combo_operand(operand))
-        return 2
-
-    # Instruction
-
-    def run_program(self, program: Program) -> None:
-        try:
-            while True:
-                instruction = self._read_instruction(program)
-                operand = self._read_program_value(program, self.inst_ptr + 1)
-                offset = instruction(operand)
-
-                self.inst_ptr += offset
-
-        except HaltException:
-            return
-
-    def _read_program_value(self, program: Program, offset: int) -> int:
-        if 0 <= offset < len(program):
-            return program[offset]
-
-        raise HaltException()
-
-    def _read_instruction(self, program: Program) -> Callable[[int], int]:
-        match self._read_program_value(program, self.inst_ptr):
+    def run_program(self, program: Program) -> list[int]:
+        return compile_program(tuple(program))(self.a, self.b, self.c)
+
+
+@cache
+def compile_program(program: tuple[int, ...]) -> CompiledProgram:
+    """
+    Compiles a program into a Python function from the initial registers to
+    the program's outputs. Instructions between jumps become straight-line
+    blocks, dispatched on the instruction pointer only when a block ends.
+    """
+    # Blocks start wherever a jump can land
+    leaders = {0}
+    for ptr in range(0, len(program) - 1):
+        if program[ptr] == 3:
+            leaders.update((program[ptr + 1], ptr + 2))
+
+    lines = [
+        "def run_program(a, b, c):",
+        "    out = []",
+        "    ptr = 0",
+        "    while True:",
+    ]
+    for leader in sorted(leader for leader in leaders if leader < len(program) - 1):
+        lines.append(f"        if ptr == {leader}:")
+        lines.extend(
+            f"            {line}" for line in _compile_block(program, leader, leaders)
+        )
+    lines.append("        return out")
+
+    namespace: dict[str, CompiledProgram] = {}
+    exec(
+        compile("\n".join(lines), f"<program {','.join(map(str, program))}>", "exec"),
+        namespace,
+    )
+    return namespace["run_program"]
+
+
+def _compile_block(program: tuple[int, ...], ptr: int, leaders: set[int]) -> list[str]:
+    lines: list[str] = []
+
+    while ptr < len(program) - 1:
+        opcode, operand = program[ptr], program[ptr + 1]
+        combo = COMBO_OPERANDS[operand] if operand < len(COMBO_OPERANDS) else None
+        if combo is None and opcode in (0, 2, 5, 6, 7):
+            lines.append(f"raise ValueError('Reserved operand {operand}')")
+            return lines
+
+        match opcode:
             case 0:
-                return self.adv
+                lines.append(f"a >>= {combo}")
             case 1:
-                return self.bxl
+                lines.append(f"b ^= {operand}")
             case 2:
-                return self.bst
+                lines.append(f"b = {combo} & 7")
             case 3:
-                return self.jnz
+                lines.append("if a:")
+                lines.extend(f"    {line}" for line in _jump(program, operand))
             case 4:
-                return self.bxc
+                lines.append("b ^= c")
             case 5:
-                return self.out
+                lines.append(f"out.append({combo} & 7)")
             case 6:
-                return self.bdv
+                lines.append(f"b = a >> {combo}")
             case 7:
-                return self.cdv
+                lines.append(f"c = a >> {combo}")
             case _:
-                raise ValueError("Invalid opcode {}")
+                lines.append(f"raise ValueError('Invalid opcode {opcode}')")
+                return lines
 
-    def _literal_operand(self, operand: int) -> int:
-        return operand
+        ptr += 2
+        if ptr in leaders:
+            lines.extend(_jump(program, ptr))
+            return lines
+
+    lines.append("return out")
+    return lines
 
-    def _combo_operand(self, operand: int) -> int:
-        match operand:
-            case 0 | 1 | 2 | 3:
-                return operand
-            case 4:
-                return self.a
-            case 5:
-                return self.b
-            case 6:
-                return self.c
-            case _:
-                raise ValueError(f"Reserved operand {operand}")
+
+def _jump(program: tuple[int, ...], target: int) -> list[str]:
+    if target >= len(program) - 1:
+        return ["return out"]
+    return [f"ptr = {target}", "continue"]
 
 
 TParsed = tuple[Computer, list[int]]
@@ -133,9 +118,7 @@ class Solution(SolutionBase[TParsed], year=2024, day=17):
     @classmethod
     def part_01(cls, parsed_input: TParsed) -> str:
         computer, program = parsed_input
-        computer.run_program(program)
-
-        return ",".join(map(str, computer.outputs))
+        return ",".join(map(str, computer.run_program(program)))
 
     @classmethod
     def part_02(cls, parsed_input: TParsed) -> int:
@@ -151,16 +134,14 @@ class Solution(SolutionBase[TParsed], year=2024, day=17):
         # 3, 0: jump to 0
 
         computer, program = parsed_input
+        run_program = compile_program(tuple(program))
 
         a = 0
         for idx in range(len(program)):
             a *= 8
             while True:
-                computer_copy = deepcopy(computer)
-                computer_copy.a = a
-                computer_copy.run_program(program)
-
-                if computer_copy.outputs[-idx - 1 :] == program[-idx - 1 :]:
+                outputs = run_program(a, computer.b, computer.c)
+                if outputs[-idx - 1 :] == program[-idx - 1 :]:
                     break
 
                 a += 1
@@ -1,70 +1,119 @@
-from dataclasses import dataclass
+from collections import deque
+from dataclasses import dataclass, field
 from typing import TextIO
 
-import networkx as nx
-
-from common.direction import Direction
-from common.position import Position
+from common.position import PackedCoords
 from common.solution import SolutionBase
+from common.union_find import find_root
 
 
 @dataclass
-class Map:
-    byte_positions: list[Position]
-    width: int = 71
-    height: int = 71
+class MemorySpace:
+    """
+    Bytes fall at (x, y) coordinates on a `size` by `size` grid, stored packed as
+    `y * size + x`.
+    """
+
+    byte_positions: list[tuple[int, int]]
+    num_fallen_bytes: int = 1024
+    size: int = 71
+    coords: PackedCoords = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        self.coords = PackedCoords(width=self.size, height=self.size)
+        for x, y in self.byte_positions:
+            if not self.coords.in_bounds(y, x):
+                raise ValueError(
+                    f"Byte at {x},{y} is outside the {self.size}x{self.size} grid"
+                )
+
+    @property
+    def start(self) -> int:
+        return 0
+
+    @property
+    def end(self) -> int:
+        return len(self.coords) - 1
+
+    def shortest_path_length(self, num_bytes: int) -> int:
+        coords = self.coords
+        corrupted = bytearray(len(coords))
+        for x, y in self.byte_positions[:num_bytes]:
+            corrupted[coords.pack(y, x)] = 1
+
+        distances = {self.start: 0}
+        frontier = deque([self.start])
+        while frontier:
+            idx = frontier.popleft()
+            if idx == self.end:
+                return distances[idx]
+
+            for next_idx in coords.neighbors(idx):
+                if not corrupted[next_idx] and next_idx not in distances:
+                    distances[next_idx] = distances[idx] + 1
+                    frontier.append(next_idx)
 
-    def graph(self, steps: int) -> nx.DiGraph:
-        byte_positions = self.byte_positions[:steps]
-        g = nx.DiGraph()
+        raise ValueError(f"No path to the exit after {num_bytes} bytes")
 
-        # Pass 1: Populate nodes
+    def first_blocking_byte(self) -> tuple[int, int]:
+        """
+        The first byte after which the exit can't be reached. Starts from the grid
+        with every byte fallen and clears them in reverse, joining each freed cell
+        with its open neighbors, until start and end end up connected.
+        """
+        coords = self.coords
+        first_fallen = [len(self.byte_positions)] * len(coords)
+        for byte_idx, (x, y) in reversed(list(enumerate(self.byte_positions))):
+            first_fallen[coords.pack(y, x)] = byte_idx
 
-        for row in range(self.height):
-            for col in range(self.width):
-                pos = Position(row, col)
-                if pos not in byte_positions:
-                    g.add_node(pos)
+        parents = list(range(len(coords)))
 
-        # Pass 2: Populate edges
+        def open_cell(idx: int) -> None:
+            for next_idx in coords.neighbors(idx):
+                if is_open[next_idx]:
+                    parents[find_root(parents, next_idx)] = find_root(parents, idx)
+            is_open[idx] = True
 
-        for pos in g.nodes:
-            for direction in Direction:
-                offset_pos = pos.with_offset(direction.offset)
-                if offset_pos in g.nodes:
-                    g.add_edge(pos, offset_pos)
+        is_open = [False] * len(coords)
+        for idx in range(len(coords)):
+            if first_fallen[idx] == len(self.byte_positions):
+                open_cell(idx)
 
-        return g
+        if find_root(parents, self.start) == find_root(parents, self.end):
+            raise ValueError("The exit stays reachable after every byte")
 
+        for byte_idx in range(len(self.byte_positions) - 1, -1, -1):
+            x, y = self.byte_positions[byte_idx]
+            idx = coords.pack(y, x)
+            # A cell only clears once its earliest byte is undone
+            if first_fallen[idx] != byte_idx:
+                continue
 
-TParsed = Map
+            open_cell(idx)
+            if find_root(parents, self.start) == find_root(parents, self.end):
+                return x, y
+
+        raise ValueError("The exit is never reachable")
+
+
+TParsed = MemorySpace
 
 
 class Solution(SolutionBase[TParsed], year=2024, day=18):
     @classmethod
     def parse_input(cls, infile: TextIO) -> TParsed:
-        byte_positions = list(
-            Position(*map(int, line.strip().split(","))) for line in infile
-        )
-        return Map(byte_positions)
+        byte_positions = [
+            (int(x), int(y))
+            for x, y in (line.strip().split(",") for line in infile if line.strip())
+        ]
+        # return MemorySpace(byte_positions, num_fallen_bytes=12, size=7)
+        return MemorySpace(byte_positions)
 
     @classmethod
     def part_01(cls, parsed_input: TParsed) -> int:
-        return nx.shortest_path_length(
-            parsed_input.graph(steps=1024),
-            Position(0, 0),
-            Position(parsed_input.height - 1, parsed_input.width - 1),
-        )
+        return parsed_input.shortest_path_length(parsed_input.num_fallen_bytes)
 
     @classmethod
-    def part_02(cls, parsed_input: TParsed) -> int:
-        # TODO(@kvchen): Manually bin'searched this, add actual binary search later
-        for steps in range(2954, 2964, 1):
-            print(steps)
-            nx.shortest_path_length(
-                parsed_input.graph(steps=steps),
-                Position(0, 0),
-                Position(parsed_input.height - 1, parsed_input.width - 1),
-            )
-
-        return 0
+    def part_02(cls, parsed_input: TParsed) -> str:
+        x, y = parsed_input.first_blocking_byte()
+        return f"{x},{y}"
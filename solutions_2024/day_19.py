@@ -1,39 +1,55 @@
 from dataclasses import dataclass
-from functools import cache
 from typing import TextIO
 
+from common.parallel import fork_map_batched
 from common.solution import SolutionBase
 
+# Trie nodes map each next letter to a child node, and this key marks the end
+# of a pattern
+PATTERN_END = ""
+TrieNode = dict[str, "TrieNode"]
+
+
+def build_trie(patterns: tuple[str, ...]) -> TrieNode:
+    root: TrieNode = {}
+    for pattern in patterns:
+        node = root
+        for letter in pattern:
+            node = node.setdefault(letter, {})
+        node[PATTERN_END] = {}
+
+    return root
+
 
 @dataclass(frozen=True)
 class Onsen:
     patterns: tuple[str, ...]
     designs: tuple[str, ...]
+    trie: TrieNode
 
-    def possible_designs(self) -> list[str]:
-        return [design for design in self.designs if self.is_design_possible(design)]
-
-    @cache
-    def is_design_possible(self, design: str) -> bool:
-        if design == "":
-            return True
-
-        return any(
-            self.is_design_possible(design[len(pattern) :])
-            for pattern in self.patterns
-            if design.startswith(pattern)
-        )
-
-    @cache
     def design_combinations(self, design: str) -> int:
-        if design == "":
-            return 1
-
-        return sum(
-            self.design_combinations(design[len(pattern) :])
-            for pattern in self.patterns
-            if design.startswith(pattern)
-        )
+        """
+        Counts the ways to make `design` from patterns, working back from its end:
+        the count from each index sums the counts from wherever a pattern
+        starting there ends, found by walking the trie.
+        """
+        combinations = [0] * len(design) + [1]
+
+        for start in range(len(design) - 1, -1, -1):
+            node = self.trie
+            total = 0
+            for end in range(start, len(design)):
+                node = node.get(design[end])  # type: ignore
+                if node is None:
+                    break
+                if PATTERN_END in node:
+                    total += combinations[end + 1]
+            combinations[start] = total
+
+        return combinations[0]
+
+    def combinations_by_design(self, designs: tuple[str, ...]) -> list[int]:
+        return [self.design_combinations(design) for design in designs]
 
 
 TParsed = Onsen
@@ -47,21 +63,28 @@ class Solution(SolutionBase[TParsed], year=2024, day=19):
 
         next(it)
 
-        designs: tuple[str, ...] = tuple(line.strip() for line in it)
-        return Onsen(patterns, designs)
+        designs: tuple[str, ...] = tuple(line.strip() for line in it if line.strip())
+        return Onsen(patterns, designs, build_trie(patterns))
 
     @classmethod
     def part_01(cls, parsed_input: TParsed) -> int:
-        return len(
-            [
-                design
-                for design in parsed_input.designs
-                if parsed_input.is_design_possible(design)
-            ]
+        return sum(
+            combinations > 0 for combinations in cls.design_combinations(parsed_input)
         )
 
     @classmethod
     def part_02(cls, parsed_input: TParsed) -> int:
-        return sum(
-            parsed_input.design_combinations(design) for design in parsed_input.designs
+        return sum(cls.design_combinations(parsed_input))
+
+    @classmethod
+    def design_combinations(cls, parsed_input: TParsed) -> list[int]:
+        # Designs are independent, so they're counted in forked workers that
+        # share the trie
+        results = fork_map_batched(
+            Onsen.combinations_by_design,
+            parsed_input,
+            parsed_input.designs,
+            min_batch_size=2000,
         )
+
+        return [combinations for batch in results for combinations in batch]
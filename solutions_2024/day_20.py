@@ -1,54 +1,92 @@
-from collections import Counter
+from collections import deque
 from dataclasses import dataclass
 from functools import cached_property
-from typing import TextIO
+from typing import Iterator, TextIO
 
-import networkx as nx
+import numpy as np
 
-from common.direction import Direction
-from common.position import Position
+from common.direction import OFFSETS
 from common.solution import SolutionBase
 
+# Distance of cells that can't be reached, small enough that sums can't overflow
+UNREACHABLE = 2**40
+
 
 @dataclass(frozen=True)
 class Racetrack:
-    graph: nx.DiGraph
-    start: Position
-    end: Position
+    track: np.ndarray
+    start: tuple[int, int]
+    end: tuple[int, int]
 
     @cached_property
-    def dists_from_start(self) -> dict[Position, int]:
-        return nx.shortest_path_length(self.graph, source=self.start)
+    def dists_from_start(self) -> np.ndarray:
+        return self._distances(self.start)
 
     @cached_property
-    def dists_to_end(self) -> dict[Position, int]:
-        return nx.shortest_path_length(self.graph, target=self.end)
+    def dists_to_end(self) -> np.ndarray:
+        # The track's edges go both ways
+        return self._distances(self.end)
 
     def num_cheats(self, *, max_skipped_steps: int, threshold: int) -> int:
-        normal_shortest_path_length = nx.shortest_path_length(
-            self.graph,
-            source=self.start,
-            target=self.end,
-        )
-        threshold = normal_shortest_path_length - threshold
-        counter: Counter[int] = Counter()
-
-        for pos in self.graph.nodes():
-            for neighbor_pos, neighbor_distance in pos.positions_within(
-                max_skipped_steps
-            ):
-                if neighbor_pos not in self.graph.nodes():
+        """
+        Counts cheats saving at least `threshold` steps. For each cheat offset,
+        the start distances of every cell and the end distances of the cell at
+        that offset are compared at once, by shifting the two arrays against
+        each other.
+        """
+        normal_shortest_path_length = int(self.dists_from_start[self.end])
+        max_length = normal_shortest_path_length - threshold
+        height, width = self.track.shape
+
+        total = 0
+        for row_offset, col_offset, distance in _offsets_within(max_skipped_steps):
+            if abs(row_offset) >= height or abs(col_offset) >= width:
+                continue
+
+            from_rows = slice(max(0, -row_offset), height - max(0, row_offset))
+            from_cols = slice(max(0, -col_offset), width - max(0, col_offset))
+            to_rows = slice(max(0, row_offset), height - max(0, -row_offset))
+            to_cols = slice(max(0, col_offset), width - max(0, -col_offset))
+
+            lengths = (
+                self.dists_from_start[from_rows, from_cols]
+                + self.dists_to_end[to_rows, to_cols]
+            )
+            total += int(np.count_nonzero(lengths <= max_length - distance))
+
+        return total
+
+    def _distances(self, source: tuple[int, int]) -> np.ndarray:
+        height, width = self.track.shape
+        track = self.track.ravel().tolist()
+
+        distances = [UNREACHABLE] * (height * width)
+        source_idx = source[0] * width + source[1]
+        distances[source_idx] = 0
+        frontier = deque([source_idx])
+
+        while frontier:
+            idx = frontier.popleft()
+            row, col = divmod(idx, width)
+            for row_offset, col_offset in OFFSETS:
+                next_row, next_col = row + row_offset, col + col_offset
+                if not (0 <= next_row < height and 0 <= next_col < width):
                     continue
 
-                dist = (
-                    self.dists_from_start[pos]
-                    + self.dists_to_end[neighbor_pos]
-                    + neighbor_distance
-                )
-                if dist <= threshold:
-                    counter[normal_shortest_path_length - dist] += 1
+                next_idx = next_row * width + next_col
+                if track[next_idx] and distances[next_idx] == UNREACHABLE:
+                    distances[next_idx] = distances[idx] + 1
+                    frontier.append(next_idx)
+
+        return np.array(distances, dtype=np.int64).reshape(height, width)
+
 
-        return counter.total()
+def _offsets_within(max_distance: int) -> Iterator[tuple[int, int, int]]:
+    for row_offset in range(-max_distance, max_distance + 1):
+        col_distance = max_distance - abs(row_offset)
+        for col_offset in range(-col_distance, col_distance + 1):
+            if row_offset or col_offset:
+                yield row_offset, col_offset, abs(row_offset) + abs(col_offset)
 
 
 TParsed = Racetrack
@@ -57,35 +95,12 @@ TParsed = Racetrack
 class Solution(SolutionBase[TParsed], year=2024, day=20):
     @classmethod
     def parse_input(cls, infile: TextIO) -> TParsed:
-        start_position = None
-        end_position = None
-
-        g = nx.DiGraph()
-        for row, line in enumerate(infile):
-            for col, char in enumerate(line.strip()):
-                if char == "#":
-                    continue
-
-                pos = Position(row, col)
-
-                match char:
-                    case "S":
-                        start_position = pos
-                    case "E":
-                        end_position = pos
-
-                g.add_node(pos)
-
-        assert start_position is not None
-        assert end_position is not None
+        grid = np.array([list(line.strip()) for line in infile if line.strip()])
 
-        for pos in g.nodes():
-            for direction in Direction:
-                neighbor_pos = pos.with_offset(direction.offset)
-                if neighbor_pos in g.nodes():
-                    g.add_edge(pos, neighbor_pos)
+        start = tuple(int(x) for x in np.argwhere(grid == "S")[0])
+        end = tuple(int(x) for x in np.argwhere(grid == "E")[0])
 
-        return Racetrack(nx.freeze(g), start_position, end_position)
+        return Racetrack(grid != "#", start, end)  # type: ignore
 
     @classmethod
     def part_01(cls, parsed_input: TParsed) -> int: